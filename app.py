@@ -1,9 +1,15 @@
 import streamlit as st
 import pandas as pd
-import io
-import re
+import os
+import threading
+import time
+import uuid
 from datetime import datetime
-from scraper import get_google_maps_data
+from run_log import RunLogger
+from exports import EXPORT_FORMATS, export_bytes
+from schema import to_frame
+from history_store import HistoryStore
+from concurrency import AimdController
 
 st.set_page_config(page_title="Google Maps Scraper", layout="wide")
 
@@ -15,14 +21,48 @@ st.markdown("""
 
 st.title("Google Maps Scraper")
 
-# Ініціалізуємо історію пошуків
-# Зберігаємо всі результати і поточний активний пошук
-if 'history' not in st.session_state:
-    st.session_state.history = {}  # тут будуть всі збережені пошуки
+# браузер для першого пошуку запускається у фоні, поки заповнюється форма
+# (з налаштуваннями за замовчуванням; MAPS_PREWARM=0 вимикає)
+@st.cache_resource
+def prewarm_browser():
+    if os.environ.get("MAPS_PREWARM", "1") == "0":
+        return None
+
+    def warm():
+        from scraper import get_driver_pool
+        get_driver_pool(True, "light").warm(1)
+
+    thread = threading.Thread(target=warm, daemon=True)
+    thread.start()
+    return thread
+
+
+prewarm_browser()
+
+# історія пошуків зберігається на диску і переживає перезапуск застосунку,
+# у пам'яті тримаються лише кілька останніх відкритих результатів
+@st.cache_resource
+def get_history_store():
+    return HistoryStore(max_in_memory=5)
+
+
+history = get_history_store()
+
+# сховище спільне для всіх сесій, тому кожна сесія бачить лише свою історію;
+# ідентифікатор зберігається в адресі сторінки, щоб історія не губилась після оновлення
+if 'history_owner' not in st.session_state:
+    st.session_state.history_owner = st.query_params.get("history") or uuid.uuid4().hex[:12]
+if st.query_params.get("history") != st.session_state.history_owner:
+    st.query_params["history"] = st.session_state.history_owner
+history_owner = st.session_state.history_owner
+
+# Зберігаємо поточний активний пошук
 if 'active_key' not in st.session_state:
     st.session_state.active_key = None  # який пошук зараз відкритий
 if 'message' not in st.session_state:
     st.session_state.message = None
+if 'export' not in st.session_state:
+    st.session_state.export = None  # готовий файл для скачування: ((пошук, формат), байти)
 
 # бокова панель
 with st.sidebar:
@@ -31,20 +71,47 @@ with st.sidebar:
         st.header("Налаштування пошуку")
         city = st.text_input("Місто", "Львів")
         obj_name = st.text_input("Що шукаємо?", "Кав'ярні")
-        limit = st.slider("Кількість результатів", 5, 100, 20)
+        limit = st.number_input("Кількість результатів", 5, 2000, 20, step=5)
 
         st.header("Налаштування драйвера")
         threads = st.slider("Потоки", 1, 5, 3)
+        adaptive_threads = st.checkbox("Підбирати кількість потоків автоматично", value=False,
+                                       help="Потоків не більше, ніж вибрано вище")
         headless_mode = st.checkbox("Headless режим", value=True)
+        pipeline_mode = st.checkbox("Обробляти сторінки під час прокрутки", value=True)
+        tiled_discovery = st.checkbox("Шукати по районах карти (великі міста)", value=False,
+                                      help="Місто ділиться на області, які шукаються паралельно")
+        engine = st.selectbox(
+            "Рушій обробки сторінок",
+            options=["selenium", "http", "cdp"],
+            format_func=lambda x: {"selenium": "Браузер (Selenium)",
+                                   "http": "HTTP без браузера",
+                                   "cdp": "Вкладки браузера (DevTools)"}[x],
+        )
+        tabs_per_browser = st.slider("Вкладок у браузері (DevTools)", 1, 8, 4)
         show_powershell = st.checkbox("Відкрити PowerShell з логами", value=False)
+        block_profile = st.selectbox(
+            "Блокування ресурсів",
+            options=["light", "aggressive", "none"],
+            format_func=lambda x: {"light": "Аналітика і шрифти",
+                                   "aggressive": "Аналітика, шрифти, карти і медіа",
+                                   "none": "Без блокування"}[x],
+        )
+        track_network = st.checkbox("Рахувати трафік сторінок", value=False)
+        max_rss = st.number_input("Ліміт пам'яті браузера, МБ (0 — без ліміту)", 0, 16000, 0, step=250,
+                                  help="Браузер понад ліміт перезапускається між сторінками")
+
+        st.header("Кеш місць")
+        use_cache = st.checkbox("Використовувати кеш", value=True)
+        cache_ttl = st.number_input("Термін актуальності (год)", 1, 24 * 30, 24)
 
         submit_button = st.form_submit_button("Почати збір даних", type="primary")
 
     st.header("Історія пошуків")
 
     # якщо в історії щось є, показуємо список результатів
-    if st.session_state.history:
-        keys = list(st.session_state.history.keys())[::-1]
+    keys = history.keys(history_owner)
+    if keys:
         index = 0
         if st.session_state.active_key in keys:
             index = keys.index(st.session_state.active_key)
@@ -62,7 +129,8 @@ with st.sidebar:
             st.rerun()
 
         if st.button("Очистити історію"):
-            st.session_state.history = {}
+            history.clear(history_owner)
+            st.session_state.export = None
             st.session_state.active_key = None
             st.session_state.message = None
             st.rerun()
@@ -71,22 +139,50 @@ with st.sidebar:
 
 # обробка нового пошуку
 if submit_button:
+    if engine == "cdp" and (adaptive_threads or track_network or max_rss):
+        st.warning("Рушій DevTools не підтримує автоматичний підбір потоків, облік трафіку "
+                   "і ліміт пам'яті браузера — ці налаштування буде вимкнено.")
     if city and obj_name:
         with st.spinner(f"Збираю дані: {obj_name} у м. {city}."):
-            # виклик скрапера, отримуємо таблицю і логи
-            new_df, new_logs = get_google_maps_data(
-                obj_name, city, limit, threads, headless_mode, show_powershell)
+            # записи показуємо в таблиці одразу, щойно їх зібрано
+            progress_text = st.empty()
+            live_table = st.empty()
+            rows = []
+            last_render = 0.0
+            # окремий журнал для кожного пошуку, щоб сесії не змішували логи
+            # selenium завантажується лише під час першого пошуку (або прогріву)
+            from scraper import iter_google_maps_data
+
+            run_log = RunLogger()
+            concurrency = AimdController(1, threads) if adaptive_threads else None
+            for record in iter_google_maps_data(
+                    obj_name, city, limit, threads, headless_mode, show_powershell,
+                    run_log=run_log, pipeline=pipeline_mode, engine=engine,
+                    use_cache=use_cache, cache_ttl_hours=cache_ttl,
+                    block_profile=block_profile, track_network=track_network,
+                    concurrency=concurrency, max_rss_mb=max_rss or None,
+                    tabs_per_browser=tabs_per_browser,
+                    discovery="tiled" if tiled_discovery else "feed"):
+                rows.append(record)
+                # не перемальовуємо таблицю частіше ніж раз на пів секунди
+                if time.time() - last_render > 0.5:
+                    progress_text.caption(f"Зібрано записів: {len(rows)} з {limit}")
+                    live_table.dataframe(pd.DataFrame(rows), width='stretch')
+                    last_render = time.time()
+
+            progress_text.empty()
+            live_table.empty()
+            new_df = to_frame(rows, city)
+            run_log.close()
+            new_logs = list(run_log.entries)
 
             if not new_df.empty:
                 # створюємо унікальну назву для збереження в історії
-                time_str = datetime.now().strftime("%H:%M:%S")
+                time_str = datetime.now().strftime("%d.%m %H:%M:%S")
                 history_key = f"{obj_name} - {city} ({time_str})"
 
-                # зберігаємо результат у словник історії
-                st.session_state.history[history_key] = {
-                    'df': new_df,
-                    'logs': new_logs
-                }
+                # зберігаємо результат в історію на диску
+                history.add(history_owner, history_key, new_df, new_logs, query=obj_name, city=city)
 
                 # встановлюємо цей результат як активний
                 st.session_state.active_key = history_key
@@ -106,8 +202,9 @@ if st.session_state.message:
 
 current_key = st.session_state.get("active_key")
 
-if current_key and current_key in st.session_state.history:
-    data_entry = st.session_state.history[current_key]
+data_entry = history.get(history_owner, current_key) if current_key else None
+
+if data_entry:
     df = data_entry['df']
     logs = data_entry['logs']
 
@@ -125,20 +222,9 @@ if current_key and current_key in st.session_state.history:
     )
 
     if view_mode == "Таблиця даних":
-        display_df = df.copy()
-        if "Відгуки" in display_df.columns:
-            display_df["Відгуки"] = (
-                display_df["Відгуки"].astype(str).str.replace(r'\D', '', regex=True)
-                .replace('', '0').fillna('0').astype(int)
-            )
-
-        if "Рейтинг" in display_df.columns:
-            display_df["Рейтинг"] = (
-                display_df["Рейтинг"].astype(str).str.extract(r'(\d+[.,]?\d*)')[0]
-                .str.replace(',', '.').fillna('0.0').astype(float)
-            )
-
-        cols = ["Назва", "Рейтинг", "Відгуки", "Адреса", "Номер тел", "Вебсайт"]
+        # колонки вже мають потрібні типи (див. schema.py)
+        display_df = df
+        cols = ["Назва", "Рейтинг", "Відгуки", "Категорія", "Адреса", "Номер тел", "Вебсайт"]
         final_cols = [c for c in cols if c in display_df.columns]
         st.dataframe(
             display_df[final_cols],
@@ -149,31 +235,34 @@ if current_key and current_key in st.session_state.history:
         )
 
         # кнопки для скачування даних
+        # файл створюється лише на запит; у пам'яті лише останній підготовлений файл
         file_prefix = current_key.replace(":", "-").replace(" ", "")
+        export_format = st.radio(
+            "Формат файлу:",
+            list(EXPORT_FORMATS.keys()),
+            format_func=lambda x: {"csv": "CSV", "xlsx": "Excel", "parquet": "Parquet"}[x],
+            horizontal=True,
+            key="export_format_radio"
+        )
+        export_key = (current_key, export_format)
+        mime, ext = EXPORT_FORMATS[export_format]
 
-        csv = df[final_cols].to_csv(index=False).encode('utf-8')
-        st.download_button("Скачати CSV", csv, f"{file_prefix}.csv", "text/csv")
+        export = st.session_state.export
+        if export is not None and export[0] != export_key:
+            # інший пошук або формат: попередній файл більше не потрібен
+            st.session_state.export = export = None
 
-        buffer = io.BytesIO()
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            display_df[final_cols].to_excel(writer, index=False)
-        st.download_button("Скачати Excel", buffer,
-                           f"{file_prefix}.xlsx", "application/vnd.ms-excel")
+        if export is None:
+            if st.button("Підготувати файл"):
+                export = (export_key, export_bytes(display_df[final_cols], export_format))
+                st.session_state.export = export
 
-    elif view_mode == "Аналітика":
-        chart_df = df.copy()
+        if export is not None:
+            st.download_button(f"Скачати {ext.upper()}", export[1],
+                               f"{file_prefix}.{ext}", mime)
 
-        # Обробка для графіків
-        if "Відгуки" in chart_df.columns:
-            chart_df["Відгуки"] = (
-                chart_df["Відгуки"].astype(str).str.replace(r'\D', '', regex=True)
-                .replace('', '0').fillna('0').astype(int)
-            )
-        if "Рейтинг" in chart_df.columns:
-            chart_df["Рейтинг"] = (
-                chart_df["Рейтинг"].astype(str).str.extract(r'(\d+[.,]?\d*)')[0]
-                .str.replace(',', '.').fillna('0.0').astype(float)
-            )
+    elif view_mode == "Аналітика":
+        chart_df = df
 
         st.subheader("Аналітика рейтингів")
         if "Рейтинг" in chart_df.columns:
@@ -0,0 +1,243 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from driver_pool import is_crash_error
+from place_cache import PlaceCache, place_id_from_url
+from run_log import RunLogger, current_run, submit
+from schema import to_frame
+from scraper import (log, get_driver_pool, check_city_exists, discover_links,
+                     start_workers, collect_workers)
+from work_queue import UrlQueue
+
+
+
+# файл завдань: JSON-список об'єктів або CSV з колонками query, city[, max_results]
+def load_jobs(path, default_max_results=20):
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            rows = json.load(f)
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+
+    jobs = []
+    for row in rows:
+        query = (row.get("query") or "").strip()
+        city = (row.get("city") or "").strip()
+        if not query or not city:
+            continue
+        max_results = int(row.get("max_results") or default_max_results)
+        jobs.append((query, city, max_results))
+    return jobs
+
+
+# ключ пакета: checkpoint іншого списку завдань не використовується
+def jobs_key(jobs):
+    data = json.dumps(sorted(list(job) for job in jobs), ensure_ascii=False)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()[:12]
+
+
+# вже оброблені місця з попереднього (перерваного) запуску того ж пакета;
+# записи інших пакетів видаляються з файлу
+def load_checkpoint(path, key):
+    done = {}
+    if not path or not os.path.exists(path):
+        return done
+    lines = []
+    stale = False
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                stale = True
+                continue  # обірваний останній рядок
+            if entry.get("jobs") != key:
+                stale = True
+                continue
+            done[entry["place_id"]] = entry["record"]
+            lines.append(line)
+    if stale:
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+    return done
+
+
+def write_output(rows, path):
+    df = to_frame(rows)
+    if path.lower().endswith((".parquet", ".pq")):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return df
+
+
+# пакетний запуск багатьох пар (запит, місто) на спільних потоках
+def run_batch(jobs, num_threads=3, discovery_threads=1, is_headless=True,
+              output="batch_results.csv", checkpoint="batch_checkpoint.jsonl",
+              engine="selenium", block_profile="light", wait_mode="adaptive",
+              use_cache=True, cache_ttl_hours=24, run_log=None):
+    owns_log = run_log is None
+    if owns_log:
+        run_log = RunLogger()
+    token = current_run.set(run_log)
+    try:
+        return _run_batch(jobs, num_threads, discovery_threads, is_headless, output,
+                          checkpoint, engine, block_profile, wait_mode,
+                          use_cache, cache_ttl_hours)
+    finally:
+        current_run.reset(token)
+        if owns_log:
+            run_log.close()
+
+
+def _run_batch(jobs, num_threads, discovery_threads, is_headless, output, checkpoint,
+               engine, block_profile, wait_mode, use_cache, cache_ttl_hours):
+    start_time = time.time()
+    key = jobs_key(jobs)
+    checkpointed = load_checkpoint(checkpoint, key)
+    log(f"Пакет: завдань {len(jobs)}, вже оброблено місць: {len(checkpointed)}")
+    # у результат потрапляють лише місця, знайдені завданнями цього запуску
+    results = {}
+
+    pool = get_driver_pool(is_headless, block_profile)
+    url_queue = UrlQueue(max_retries=2)
+    cache = PlaceCache(ttl_hours=cache_ttl_hours) if use_cache else None
+    lock = threading.Lock()
+    place_jobs = {}
+    city_checked = {}
+    checkpoint_file = open(checkpoint, "a", encoding="utf-8") if checkpoint else None
+
+    # кожне оброблене місце одразу дописується в checkpoint
+    def save(place_id, url, job, record):
+        row = dict(record, **{"Запит": job[0], "Місто": job[1], "Посилання": url})
+        with lock:
+            results[place_id] = row
+            if checkpoint_file:
+                checkpoint_file.write(json.dumps(
+                    {"jobs": key, "place_id": place_id, "url": url, "record": row},
+                    ensure_ascii=False) + "\n")
+                checkpoint_file.flush()
+
+    # місце, знайдене в кількох завданнях, обробляється один раз
+    def enqueue(url, job):
+        place_id = place_id_from_url(url)
+        with lock:
+            if place_id in results or place_id in place_jobs:
+                return True
+            place_jobs[place_id] = job
+            if place_id in checkpointed:
+                results[place_id] = checkpointed[place_id]
+                return True
+        if cache:
+            cached = cache.get_fresh(place_id)
+            if cached:
+                save(place_id, url, job, cached[0])
+                return True
+        url_queue.put(url)
+        return True
+
+    def on_record(url, record, seconds):
+        place_id = place_id_from_url(url)
+        if cache:
+            cache.put(place_id, url, record, seconds)
+        save(place_id, url, place_jobs.get(place_id, ("", "")), record)
+
+    # потік пошуку посилань: бере завдання по одному, місто перевіряється один раз
+    def discovery_worker(job_queue):
+        driver = pool.lease()
+        try:
+            while True:
+                try:
+                    query, city, max_results = job_queue.get_nowait()
+                except queue.Empty:
+                    return
+
+                job = (query, city)
+                try:
+                    with lock:
+                        city_ok = city_checked.get(city)
+                    # сторінку міста, щойно відкриту перевіркою, пошук не завантажує вдруге
+                    city_loaded = city_ok is None
+                    if city_ok is None:
+                        city_ok = check_city_exists(driver, city)
+                        with lock:
+                            city_checked[city] = city_ok
+                    if not city_ok:
+                        continue
+
+                    log(f"Пакет: '{query}' у '{city}'")
+                    discover_links(driver, query, city, max_results,
+                                   on_link=lambda url: enqueue(url, job),
+                                   wait_mode=wait_mode, city_loaded=city_loaded)
+                except Exception as e:
+                    log(f"Пакет: помилка пошуку '{query}' у '{city}': {e}")
+                    # наступні завдання не мають працювати на завислому браузері
+                    if is_crash_error(e):
+                        driver = pool.restart(driver, delay=2)
+        finally:
+            pool.release(driver)
+
+    job_queue = queue.Queue()
+    for job in jobs:
+        job_queue.put(job)
+
+    try:
+        with ThreadPoolExecutor(max_workers=num_threads + discovery_threads + 1) as executor:
+            futures = start_workers(executor, url_queue, num_threads, is_headless,
+                                    engine, on_record=on_record, pool=pool,
+                                    block_profile=block_profile)
+            discovery = [submit(executor, discovery_worker, job_queue)
+                         for _ in range(discovery_threads)]
+            try:
+                for future in discovery:
+                    future.result()
+            finally:
+                url_queue.close()
+            collect_workers(futures)
+    finally:
+        url_queue.cancel()
+        if checkpoint_file:
+            checkpoint_file.close()
+        if cache:
+            cache.close()
+
+    df = write_output(list(results.values()), output)
+    # checkpoint потрібен лише для відновлення перерваного пакета: після успішного
+    # запуску повторний пакет знову бере місця з кешу з його терміном актуальності
+    if checkpoint and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    log(f"Пакет завершено: {len(df)} унікальних місць, файл {output}")
+    log(f"Загальний час виконання: {time.time() - start_time:.2f} сек")
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетний збір даних з Google Maps")
+    parser.add_argument("jobs", help="файл завдань (.json або .csv з колонками query, city)")
+    parser.add_argument("--output", default="batch_results.csv", help=".csv або .parquet")
+    parser.add_argument("--checkpoint", default="batch_checkpoint.jsonl")
+    parser.add_argument("--max-results", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=3)
+    parser.add_argument("--discovery-threads", type=int, default=1)
+    parser.add_argument("--engine", default="selenium", choices=["selenium", "http", "cdp"])
+    parser.add_argument("--block-profile", default="light")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--show-browser", action="store_true")
+    args = parser.parse_args(argv)
+
+    jobs = load_jobs(args.jobs, args.max_results)
+    run_batch(jobs, args.threads, args.discovery_threads, not args.show_browser,
+              args.output, args.checkpoint, args.engine, args.block_profile,
+              use_cache=not args.no_cache)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import json
+
+METRICS = ["pages_per_sec", "pages_per_sec_per_gb", "time_to_first_record", "seconds",
+           "peak_rss_mb_mean", "requests_per_page", "kb_per_page"]
+
+
+def load_runs(path):
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    return report, {(r["threads"], r["engine"], r["pipeline"], r.get("block_profile", "light")): r
+                    for r in report["runs"]}
+
+
+# порівняння двох файлів результатів: зміна метрик у відсотках
+def compare(old_path, new_path):
+    old_report, old_runs = load_runs(old_path)
+    new_report, new_runs = load_runs(new_path)
+    print(f"{old_report.get('revision') or old_path} -> {new_report.get('revision') or new_path}")
+
+    # адаптивний запуск (threads="adaptive") іде після запусків з фіксованою кількістю потоків
+    for key in sorted(set(old_runs) & set(new_runs),
+                      key=lambda k: (isinstance(k[0], str), str(k[0]).zfill(4), k[1], k[2], k[3])):
+        threads, engine, pipeline, profile = key
+        print(f"потоків {threads}, рушій {engine}, конвеєр {pipeline}, блокування {profile}:")
+        for metric in METRICS:
+            old = old_runs[key].get(metric, old_runs[key].get("network", {}).get(metric))
+            new = new_runs[key].get(metric, new_runs[key].get("network", {}).get(metric))
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100 if old else 0.0
+            print(f"  {metric:<22} {old:>10} -> {new:>10} ({change:+.1f}%)")
+
+    # холодний старт: середнє по всіх вимірюваннях
+    for metric in ("import_scraper_s", "time_to_first_navigation_s"):
+        old = [r[metric] for r in old_report.get("startup", []) if metric in r]
+        new = [r[metric] for r in new_report.get("startup", []) if metric in r]
+        if not old or not new:
+            continue
+        old, new = sum(old) / len(old), sum(new) / len(new)
+        change = (new - old) / old * 100 if old else 0.0
+        print(f"старт {metric:<28} {old:>8.3f} -> {new:>8.3f} ({change:+.1f}%)")
+
+    old_exports = {e["format"]: e for e in old_report.get("exports", [])}
+    new_exports = {e["format"]: e for e in new_report.get("exports", [])}
+    for fmt in sorted(set(old_exports) & set(new_exports)):
+        print(f"експорт {fmt}:")
+        for metric in ("seconds", "peak_mb"):
+            old = old_exports[fmt][metric]
+            new = new_exports[fmt][metric]
+            change = (new - old) / old * 100 if old else 0.0
+            print(f"  {metric:<22} {old:>10} -> {new:>10} ({change:+.1f}%)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Порівняння результатів бенчмарку")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    args = parser.parse_args()
+    compare(args.old, args.new)
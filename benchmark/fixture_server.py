@@ -0,0 +1,502 @@
+import html
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tiles import TILE_FEED_CAP, Tile, tile_bounds, viewport_from_url  # noqa: E402
+
+# видима область "міста", яку повертає пошук міста (центр Львова, масштаб 12)
+CITY_VIEWPORT = Tile(49.84, 24.03, 12, 0)
+
+CATEGORIES = ["Кав'ярня", "Ресторан", "Пекарня", "Бар", "Кондитерська"]
+STREETS = ["вул. Руська", "просп. Свободи", "вул. Городоцька", "пл. Ринок", "вул. Личаківська"]
+
+# сторінка пошуку: поле вводу, кнопка і стрічка, яка догружається при прокрутці
+SEARCH_PAGE = """<!doctype html>
+<html lang="uk"><head><meta charset="utf-8"><title>Fixture Maps</title></head>
+<body>
+<input id="searchboxinput" type="text" value="">
+<button id="searchbox-searchbutton">Пошук</button>
+<div id="pane"></div>
+<script>
+// стрічка сторінки; пошук з поля вводу підвантажує стрічку для введеного запиту
+let PLACES = __PLACES__;
+const BATCH = __BATCH__;
+const DELAY = __DELAY__;
+// пошук з @широта,довгота,масштабz одразу показує стрічку для цієї області
+const AREA = __AREA__;
+
+// як у Google Maps: пошук міста відкриває сторінку місця з видимою областю міста
+if (!AREA && !location.pathname.includes('/place/')) {
+    history.replaceState(null, '', location.pathname.replace('/search/', '/place/') + '/@__CENTER__');
+}
+
+function renderFeed() {
+    const pane = document.getElementById('pane');
+    pane.innerHTML = '';
+    const feed = document.createElement('div');
+    feed.setAttribute('role', 'feed');
+    feed.style.height = '600px';
+    feed.style.overflowY = 'auto';
+    pane.appendChild(feed);
+
+    let shown = 0;
+    let loading = false;
+
+    function append() {
+        const end = Math.min(shown + BATCH, PLACES.length);
+        for (; shown < end; shown++) {
+            const item = document.createElement('div');
+            item.className = 'Nv2PK';
+            item.style.height = '120px';
+            const a = document.createElement('a');
+            a.className = 'hfpxzc';
+            a.href = PLACES[shown].href;
+            a.setAttribute('aria-label', PLACES[shown].name);
+            item.appendChild(a);
+            item.appendChild(document.createTextNode(PLACES[shown].name));
+            feed.appendChild(item);
+        }
+        if (shown >= PLACES.length) {
+            const marker = document.createElement('span');
+            marker.className = 'HlvSq';
+            marker.textContent = "You've reached the end of the list.";
+            feed.appendChild(marker);
+        }
+    }
+
+    append();
+    feed.addEventListener('scroll', () => {
+        if (loading || shown >= PLACES.length) {
+            return;
+        }
+        if (feed.scrollTop + feed.clientHeight >= feed.scrollHeight - 50) {
+            loading = true;
+            setTimeout(() => { append(); loading = false; }, DELAY);
+        }
+    });
+}
+
+function search() {
+    const query = document.getElementById('searchboxinput').value.trim();
+    if (!query) {
+        setTimeout(renderFeed, DELAY);
+        return;
+    }
+    fetch('/maps/feed/' + encodeURIComponent(query))
+        .then(response => response.json())
+        .then(places => {
+            PLACES = places;
+            setTimeout(renderFeed, DELAY);
+        });
+}
+
+document.getElementById('searchboxinput').addEventListener('keydown', e => {
+    if (e.key === 'Enter') {
+        search();
+    }
+});
+document.getElementById('searchbox-searchbutton').addEventListener('click', search);
+if (AREA) {
+    setTimeout(renderFeed, DELAY);
+}
+</script>
+</body></html>
+"""
+
+# сторінка місця з тими ж класами і атрибутами, що й у Google Maps,
+# плюс ресурси, які можна заблокувати (шрифт, аналітика, тайли карти)
+PLACE_BODY = """<div role="main">
+<h1 class="DUwDvf">{name}</h1>
+<div class="F7nice"><span><span aria-hidden="true">{rating}</span></span><span><span aria-label="{reviews} відгуків">({reviews_text})</span></span></div>
+<button class="DkEaL" jsaction="pane.rating.category">{category}</button>
+<button data-item-id="address" aria-label="Адреса: {address}"><div class="Io6YTe">{address}</div></button>
+<a data-item-id="authority" href="{website}"><div class="Io6YTe">{domain}</div></a>
+<button data-item-id="phone:tel:{phone}" aria-label="Телефон: {phone}"><div class="Io6YTe">{phone}</div></button>
+</div>"""
+
+# вкладка відгуків: список догружається порціями при прокрутці панелі, як у Google Maps;
+# за замовчуванням порядок "найрелевантніші", меню сортування дозволяє вибрати "найновіші"
+REVIEWS_BLOCK = """<button role="tab" aria-label="Відгуки" id="reviews-tab">Відгуки</button>
+<div id="reviews-pane"></div>
+<script>
+(function() {
+const REVIEWS = __REVIEWS__;
+const BATCH = __BATCH__;
+const DELAY = __DELAY__;
+
+function render(order) {
+    const pane = document.getElementById('reviews-pane');
+    pane.innerHTML = '';
+    const sort = document.createElement('button');
+    sort.setAttribute('aria-label', 'Сортувати відгуки');
+    sort.textContent = 'Сортувати';
+    sort.addEventListener('click', () => {
+        const menu = document.createElement('div');
+        menu.setAttribute('role', 'menu');
+        ['Найрелевантніші', 'Найновіші'].forEach((label, index) => {
+            const item = document.createElement('div');
+            item.setAttribute('role', 'menuitemradio');
+            item.setAttribute('data-index', String(index));
+            item.textContent = label;
+            item.addEventListener('click', () => {
+                menu.remove();
+                setTimeout(() => render(index === 1 ? 'newest' : 'relevant'), DELAY);
+            });
+            menu.appendChild(item);
+        });
+        document.body.appendChild(menu);
+    });
+    pane.appendChild(sort);
+
+    const list = document.createElement('div');
+    list.className = 'm6QErb DxyBCb';
+    list.style.height = '600px';
+    list.style.overflowY = 'auto';
+    pane.appendChild(list);
+
+    const items = order === 'newest'
+        ? REVIEWS.slice().sort((a, b) => b.seq - a.seq)
+        : REVIEWS.slice().sort((a, b) => a.rank - b.rank);
+    let shown = 0;
+    let loading = false;
+
+    function append() {
+        const end = Math.min(shown + BATCH, items.length);
+        for (; shown < end; shown++) {
+            const r = items[shown];
+            const el = document.createElement('div');
+            el.className = 'jftiEf fontBodyMedium';
+            el.setAttribute('data-review-id', r.id);
+            el.style.height = '150px';
+            el.innerHTML = '<div class="d4r55"></div><span class="kvMYJc" role="img"></span>' +
+                '<span class="rsqaWe"></span><span class="wiI7pd"></span>';
+            el.querySelector('.d4r55').textContent = r.author;
+            el.querySelector('.kvMYJc').setAttribute('aria-label', r.rating + ' зірок');
+            el.querySelector('.rsqaWe').textContent = r.date;
+            el.querySelector('.wiI7pd').textContent = r.text;
+            list.appendChild(el);
+        }
+    }
+
+    append();
+    list.addEventListener('scroll', () => {
+        if (loading || shown >= items.length) {
+            return;
+        }
+        if (list.scrollTop + list.clientHeight >= list.scrollHeight - 50) {
+            loading = true;
+            setTimeout(() => { append(); loading = false; }, DELAY);
+        }
+    });
+}
+
+document.getElementById('reviews-tab').addEventListener('click', () => {
+    setTimeout(() => render('relevant'), DELAY);
+});
+})();
+</script>"""
+
+PLACE_PAGE = """<!doctype html>
+<html lang="uk"><head><meta charset="utf-8"><title>{title}</title>
+<style>@font-face {{ font-family: Fixture; src: url('/static/fixture.woff2'); }} body {{ font-family: Fixture; }}</style>
+</head>
+<body>
+{body}
+{reviews_block}
+<img src="/gen_204?ev=load" width="1" height="1">
+<script>
+for (let i = 0; i < 4; i++) {{ fetch('/maps/vt?pb=' + i).catch(() => {{}}); }}
+fetch('/static/analytics.js?gen_204').catch(() => {{}});
+</script>
+</body></html>
+"""
+
+# варіант, де вміст з'являється лише після виконання JS (HTTP-рушій його не розбере)
+JS_PLACE_PAGE = """<!doctype html>
+<html lang="uk"><head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+<div id="app"></div>
+<script>
+setTimeout(() => {{ document.getElementById('app').innerHTML = {body_json}; }}, 300);
+</script>
+</body></html>
+"""
+
+
+# набір вигаданих місць, однаковий для однакового seed
+# координати рівномірно розподілені у видимій області міста CITY_VIEWPORT
+def make_places(query, count, seed=42, js_render_rate=0.0):
+    rng = random.Random(f"{seed}:{query}")
+    geo = random.Random(f"{seed}:{query}:geo")
+    south, west, north, east = tile_bounds(CITY_VIEWPORT)
+    places = []
+    for i in range(count):
+        name = f"{query} №{i + 1}"
+        feature_id = f"0x{rng.getrandbits(60):x}:0x{rng.getrandbits(60):x}"
+        slug = name.replace(" ", "+")
+        lat, lng = geo.uniform(south, north), geo.uniform(west, east)
+        places.append({
+            "name": name,
+            "feature_id": feature_id,
+            "lat": lat,
+            "lng": lng,
+            "href": f"/maps/place/{slug}/data=!4m7!3m6!1s{feature_id}!8m2!3d{lat:.6f}!4d{lng:.6f}",
+            "rating": f"{rng.uniform(3.0, 5.0):.1f}".replace(".", ","),
+            "reviews": rng.randint(0, 5000),
+            "category": rng.choice(CATEGORIES),
+            "address": f"{rng.choice(STREETS)}, {rng.randint(1, 120)}",
+            "phone": f"+38032{rng.randint(1000000, 9999999)}",
+            "website": f"https://place{i + 1}.example.com/",
+            "js_render": rng.random() < js_render_rate,
+        })
+    return places
+
+
+# відгуки місця: seq росте від найстарішого до найновішого, тому при збільшенні
+# reviews_per_place нові відгуки додаються "зверху", а старі не змінюються
+def make_reviews(place, count, seed=42):
+    reviews = []
+    for seq in range(1, count + 1):
+        rng = random.Random(f"{seed}:{place['feature_id']}:{seq}")
+        reviews.append({
+            "id": f"R{place['feature_id'][-8:]}{seq:05d}",
+            "seq": seq,
+            "rank": rng.random(),
+            "author": f"Автор {rng.randint(1, 9999)}",
+            "rating": rng.randint(1, 5),
+            "date": f"{count - seq + 1} дн. тому",
+            "text": f"Відгук №{seq} про {place['name']}",
+        })
+    return reviews
+
+
+def render_reviews(reviews, batch=10, delay_ms=200):
+    if not reviews:
+        return ""
+    return (REVIEWS_BLOCK
+            .replace("__REVIEWS__", json.dumps(reviews, ensure_ascii=False).replace("</", "<\\/"))
+            .replace("__BATCH__", str(batch))
+            .replace("__DELAY__", str(delay_ms)))
+
+
+def render_place(place, reviews=None):
+    # з вкладкою відгуків кількість у заголовку збігається з довжиною списку, як у Google Maps
+    if reviews:
+        place = dict(place, reviews=len(reviews))
+    reviews_text = f"{place['reviews']:,}".replace(",", "\xa0")
+    body = PLACE_BODY.format(
+        name=html.escape(place["name"]),
+        rating=place["rating"],
+        reviews=place["reviews"],
+        reviews_text=reviews_text,
+        category=html.escape(place["category"]),
+        address=html.escape(place["address"]),
+        website=place["website"],
+        domain=urlsplit(place["website"]).netloc,
+        phone=place["phone"],
+    )
+    title = html.escape(place["name"])
+    if place["js_render"]:
+        return JS_PLACE_PAGE.format(title=title, body_json=json.dumps(body))
+    return PLACE_PAGE.format(title=title, body=body, reviews_block=render_reviews(reviews))
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8"):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_GET(self):
+        server = self.server
+        path = unquote(urlsplit(self.path).path)
+        server.count(path)
+
+        # стрічка для запиту, введеного в поле пошуку
+        if path.startswith("/maps/feed/"):
+            query = path[len("/maps/feed/"):]
+            return self._send(200, json.dumps(server.feed(query), ensure_ascii=False),
+                              "application/json; charset=utf-8")
+
+        if path.startswith("/maps/search/"):
+            query = path[len("/maps/search/"):].split("/")[0]
+            return self._send(200, server.search_page(query, viewport_from_url(path)))
+
+        if path.startswith("/maps/place/") and "/data=" in path:
+            return self._place(path)
+
+        if path.startswith("/maps/place/"):
+            # сторінка міста після переходу з пошуку
+            return self._send(200, server.search_page(path.split("/")[3]))
+
+        # ресурси, які мають блокуватися профілями network.BLOCK_PROFILES
+        if path.startswith("/static/") or path.startswith("/maps/vt") or path.startswith("/gen_204"):
+            return self._send(200, b"\0" * server.asset_bytes, "application/octet-stream")
+
+        self._send(404, "not found")
+
+    def _place(self, path):
+        server = self.server
+        place = server.find_place(path)
+        if place is None:
+            return self._send(404, "not found")
+
+        # штучні затримки і збої для перевірки стійкості скрапера
+        concurrent = server.enter_place()
+        try:
+            delay = server.latency_ms / 1000
+            if server.latency_ms:
+                delay *= server.rng_uniform(0.5, 1.5)
+            if server.slow_rate and server.rng_uniform(0, 1) < server.slow_rate:
+                delay *= 10
+            # перевантаження: кожен одночасний запит сторінки місця додає затримку
+            delay += server.load_latency_ms * (concurrent - 1) / 1000
+            if delay:
+                time.sleep(delay)
+            if server.fail_rate and server.rng_uniform(0, 1) < server.fail_rate:
+                return self._send(503, "unavailable")
+
+            reviews = make_reviews(place, server.reviews_per_place, server.seed)
+            self._send(200, render_place(place, reviews))
+        finally:
+            server.leave_place()
+
+
+# локальний сервер, схожий на Google Maps, для відтворюваних вимірювань
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, places=60, batch=7, feed_delay_ms=200, latency_ms=0,
+                 fail_rate=0.0, slow_rate=0.0, js_render_rate=0.0, asset_bytes=30000, seed=42,
+                 load_latency_ms=0, feed_cap=TILE_FEED_CAP, reviews_per_place=0):
+        super().__init__(("127.0.0.1", port), FixtureHandler)
+        self.places_count = places
+        self.batch = batch
+        self.feed_delay_ms = feed_delay_ms
+        self.latency_ms = latency_ms
+        self.fail_rate = fail_rate
+        self.slow_rate = slow_rate
+        self.load_latency_ms = load_latency_ms
+        self.feed_cap = feed_cap
+        # можна змінювати між запусками, щоб з'явились нові відгуки
+        self.reviews_per_place = reviews_per_place
+        self.js_render_rate = js_render_rate
+        self.asset_bytes = asset_bytes
+        self.seed = seed
+        self.requests = {}
+        self.place_in_flight = 0
+        self.place_in_flight_max = 0
+        self._places = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, path):
+        kind = path.split("/")[1] if "/" in path else path
+        with self._lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+
+    def enter_place(self):
+        with self._lock:
+            self.place_in_flight += 1
+            self.place_in_flight_max = max(self.place_in_flight_max, self.place_in_flight)
+            return self.place_in_flight
+
+    def leave_place(self):
+        with self._lock:
+            self.place_in_flight -= 1
+
+    def rng_uniform(self, a, b):
+        with self._lock:
+            return self._rng.uniform(a, b)
+
+    def places_for(self, query):
+        with self._lock:
+            if query not in self._places:
+                self._places[query] = make_places(
+                    query, self.places_count, self.seed, self.js_render_rate)
+            return self._places[query]
+
+    # стрічка пошуку, як у Google Maps, не довша за feed_cap;
+    # area: Tile з адреси пошуку — тоді лише місця в її межах
+    def feed(self, query, area=None):
+        places = self.places_for(query)
+        if area:
+            south, west, north, east = tile_bounds(area)
+            places = [p for p in places if south <= p["lat"] < north and west <= p["lng"] < east]
+        return [{"href": p["href"], "name": p["name"]} for p in places[:self.feed_cap]]
+
+    def search_page(self, query, area=None):
+        places = self.feed(query, area)
+        center = f"{CITY_VIEWPORT.lat},{CITY_VIEWPORT.lng},{CITY_VIEWPORT.zoom}z"
+        return (SEARCH_PAGE
+                .replace("__PLACES__", json.dumps(places, ensure_ascii=False))
+                .replace("__BATCH__", str(self.batch))
+                .replace("__DELAY__", str(self.feed_delay_ms))
+                .replace("__AREA__", "true" if area else "false")
+                .replace("__CENTER__", center))
+
+    def find_place(self, path):
+        with self._lock:
+            groups = list(self._places.values())
+        for places in groups:
+            for place in places:
+                if place["feature_id"] in path:
+                    return place
+        return None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Локальний сервер-імітація Google Maps")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--places", type=int, default=60)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--load-latency-ms", type=int, default=0,
+                        help="додаткова затримка на кожен одночасний запит сторінки місця")
+    parser.add_argument("--feed-cap", type=int, default=TILE_FEED_CAP,
+                        help="максимум записів у стрічці пошуку (міста або області)")
+    parser.add_argument("--reviews", type=int, default=0, help="відгуків на кожній сторінці місця")
+    parser.add_argument("--js-render-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FixtureServer(args.port, places=args.places, latency_ms=args.latency_ms,
+                           fail_rate=args.fail_rate, slow_rate=args.slow_rate,
+                           js_render_rate=args.js_render_rate,
+                           load_latency_ms=args.load_latency_ms, feed_cap=args.feed_cap,
+                           reviews_per_place=args.reviews)
+    print(f"Сервер працює: {server.url}/maps  (MAPS_BASE_URL)")
+    server.serve_forever()
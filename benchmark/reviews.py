@@ -0,0 +1,54 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark.fixture_server import FixtureServer  # noqa: E402
+from driver_pool import close_all  # noqa: E402
+from reviews import run_reviews  # noqa: E402
+
+
+# повний збір відгуків, потім додаємо нові відгуки на сервері і збираємо лише їх
+def bench_reviews(places, reviews, added, threads):
+    server = FixtureServer(places=places, reviews_per_place=reviews).start()
+    workdir = tempfile.mkdtemp(prefix="reviews-bench-")
+    index = os.path.join(workdir, "review_index.sqlite3")
+    urls = [server.url + place["href"] for place in server.places_for("кафе")]
+    result = {"places": places, "reviews_per_place": reviews, "added_per_place": added}
+    try:
+        start = time.time()
+        stats = run_reviews(urls, os.path.join(workdir, "full.csv"), threads,
+                            index_path=index)
+        result["full_reviews"] = stats.reviews
+        result["full_s"] = round(time.time() - start, 2)
+
+        server.reviews_per_place = reviews + added
+        start = time.time()
+        stats = run_reviews(urls, os.path.join(workdir, "incremental.csv"), threads,
+                            incremental=True, index_path=index)
+        result["incremental_reviews"] = stats.reviews
+        result["incremental_s"] = round(time.time() - start, 2)
+        result["incremental_ok"] = stats.reviews == places * added
+    finally:
+        close_all()
+        server.stop()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Перевірка збору відгуків на локальному сервері")
+    parser.add_argument("--places", type=int, default=5)
+    parser.add_argument("--reviews", type=int, default=45)
+    parser.add_argument("--added", type=int, default=7)
+    parser.add_argument("--threads", type=int, default=2)
+    args = parser.parse_args(argv)
+    print(json.dumps(bench_reviews(args.places, args.reviews, args.added, args.threads),
+                     ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
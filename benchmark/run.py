@@ -0,0 +1,320 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import urllib.request
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scraper  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from benchmark.fixture_server import FixtureServer, make_places  # noqa: E402
+from concurrency import AimdController  # noqa: E402
+from driver_pool import close_all  # noqa: E402
+from extract import extract_place, parse_place_html  # noqa: E402
+from exports import EXPORTERS  # noqa: E402
+from network import NetworkStats  # noqa: E402
+from procmem import MemoryWatchdog  # noqa: E402
+from run_log import RunLogger  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return ""
+
+
+# зведення пам'яті драйверів за часовими лініями MemoryWatchdog
+def rss_summary(watchdog):
+    timelines = watchdog.timelines_mb()
+    peaks = [max(mb for _, mb, _ in samples) for samples in timelines.values()]
+    means = [sum(mb for _, mb, _ in samples) / len(samples) for samples in timelines.values()]
+    return {
+        "drivers": len(timelines),
+        "peak_rss_mb_max": round(max(peaks), 1) if peaks else 0,
+        "peak_rss_mb_mean": round(sum(peaks) / len(peaks), 1) if peaks else 0,
+        "mean_rss_mb": round(sum(means) / len(means), 1) if means else 0,
+        "total_peak_rss_mb": round(sum(peaks), 1),
+        "memory_recycles": watchdog.recycled,
+        "memory_timelines": timelines,
+    }
+
+
+# один запуск скрапера проти локального сервера
+def run_scenario(query, city, max_results, threads, engine="selenium", pipeline=False,
+                 block_profile="light", keep_warm=False, max_rss_mb=None, track_network=False,
+                 **kwargs):
+    if not keep_warm:
+        close_all()
+
+    pool = scraper.get_driver_pool(True, block_profile, track_network)
+    # запити, КБ і заблоковані запити кожної сторінки для порівняння профілів блокування
+    net_stats = NetworkStats(block_profile) if track_network else None
+    # нагляд за пам'яттю: часові лінії RSS і перезапуск драйверів понад max_rss_mb;
+    # передається в запуск, щоб той не створював другий нагляд на тому ж пулі
+    sampler = MemoryWatchdog(pool, max_rss_mb, interval=0.5).start()
+    run_log = RunLogger(echo=False)
+
+    start = time.time()
+    first_record = None
+    records = 0
+    try:
+        for _ in scraper.iter_google_maps_data(
+                query, city, max_results, threads, True, run_log=run_log,
+                engine=engine, pipeline=pipeline, use_cache=False,
+                block_profile=block_profile, watchdog=sampler, net_stats=net_stats, **kwargs):
+            records += 1
+            if first_record is None:
+                first_record = time.time() - start
+    finally:
+        duration = time.time() - start
+        sampler.stop()
+        run_log.close()
+
+    result = {
+        "threads": threads,
+        "engine": engine,
+        "discovery": kwargs.get("discovery", "feed"),
+        "tabs_per_browser": kwargs.get("tabs_per_browser", 4) if engine == "cdp" else None,
+        "pipeline": pipeline,
+        "block_profile": block_profile,
+        "records": records,
+        "seconds": round(duration, 3),
+        "pages_per_sec": round(records / duration, 3) if duration else 0,
+        "time_to_first_record": round(first_record, 3) if first_record is not None else None,
+        "log_file": run_log.path,
+    }
+    result.update(rss_summary(sampler))
+    if net_stats:
+        result["network"] = net_stats.as_dict()
+    # пропускна здатність на гігабайт пам'яті всіх браузерів
+    total_gb = result["total_peak_rss_mb"] / 1024
+    result["pages_per_sec_per_gb"] = round(result["pages_per_sec"] / total_gb, 3) if total_gb else 0
+    return result
+
+
+# таблиця результатів потрібного розміру з вигаданих місць
+def sample_frame(rows):
+    places = make_places("Кав'ярні", rows)
+    return pd.DataFrame([{
+        "Назва": p["name"],
+        "Рейтинг": p["rating"],
+        "Відгуки": str(p["reviews"]),
+        "Адреса": p["address"],
+        "Номер тел": p["phone"],
+        "Вебсайт": p["website"],
+    } for p in places])
+
+
+# попередній спосіб: повна книга openpyxl через pd.ExcelWriter
+def excel_writer_bytes(df):
+    import io
+
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False)
+    return buffer.getvalue()
+
+
+# час і пікова пам'ять (tracemalloc) для кожного формату експорту
+def bench_exports(rows):
+    df = sample_frame(rows)
+    exporters = dict(EXPORTERS, xlsx_excelwriter=excel_writer_bytes)
+    results = []
+    for fmt, exporter in exporters.items():
+        tracemalloc.start()
+        start = time.perf_counter()
+        data = exporter(df)
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append({
+            "format": fmt,
+            "rows": rows,
+            "seconds": round(seconds, 4),
+            "peak_mb": round(peak / 1024 / 1024, 2),
+            "size_kb": round(len(data) / 1024, 1),
+        })
+    return results
+
+
+# холодний старт в окремому процесі: імпорт, chromedriver, перша навігація
+def bench_startup(repeats):
+    server = FixtureServer().start()
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = []
+    try:
+        for _ in range(repeats):
+            output = subprocess.check_output(
+                [sys.executable, "-m", "benchmark.startup", server.url], cwd=root, text=True)
+            result = json.loads(output.strip().splitlines()[-1])
+            print(json.dumps(result, ensure_ascii=False))
+            results.append(result)
+    finally:
+        server.stop()
+    return results
+
+
+# однаковий запис з однієї сторінки місця: парсер HTML (рушій http) проти
+# EXTRACT_SCRIPT у браузері; повертає кількість сторінок і розбіжності по полях
+def bench_parity(places):
+    server = FixtureServer(places=places).start()
+    urls = [server.url + quote(place["href"], safe="/:!=+")
+            for place in server.places_for("Кав'ярні")]
+    mismatches = []
+    driver = scraper.get_driver(True)
+    try:
+        for url in urls:
+            with urllib.request.urlopen(url) as response:
+                html_record = parse_place_html(response.read().decode("utf-8"))
+            driver.get(url)
+            script_record = extract_place(driver)
+            fields = sorted(k for k in set(html_record or {}) | set(script_record or {})
+                            if (html_record or {}).get(k) != (script_record or {}).get(k))
+            if fields:
+                mismatches.append({"url": url, "fields": fields,
+                                   "html": html_record, "script": script_record})
+    finally:
+        driver.quit()
+        server.stop()
+    result = {"pages": len(urls), "mismatches": mismatches}
+    print(json.dumps({"pages": len(urls), "mismatched_pages": len(mismatches)}, ensure_ascii=False))
+    return result
+
+
+# масштабування 1..N потоків проти локального сервера
+# adaptive: додатковий запуск з AimdController у межах 1..N потоків
+# для рушія cdp N — кількість браузерів, у кожному args.tabs вкладок
+def run_scaling(args):
+    server = FixtureServer(places=args.places, latency_ms=args.latency_ms,
+                           fail_rate=args.fail_rate, slow_rate=args.slow_rate,
+                           load_latency_ms=args.load_latency_ms,
+                           feed_cap=args.feed_cap).start()
+    scraper.MAPS_URL = f"{server.url}/maps"
+
+    runs = []
+    try:
+        for engine in args.engine:
+            for profile in args.block_profile:
+                for threads in range(1, args.max_threads + 1):
+                    result = run_scenario("Кав'ярні", "Львів", args.places, threads,
+                                          engine=engine, pipeline=args.pipeline,
+                                          block_profile=profile, keep_warm=args.keep_warm,
+                                          max_rss_mb=args.max_rss_mb,
+                                          track_network=args.track_network,
+                                          tabs_per_browser=args.tabs, discovery=args.discovery,
+                                          tile_zoom=args.tile_zoom)
+                    print(json.dumps(result, ensure_ascii=False))
+                    runs.append(result)
+
+        if args.adaptive:
+            controller = AimdController(1, args.max_threads, latency_target=args.latency_target)
+            result = run_scenario("Кав'ярні", "Львів", args.places, 1,
+                                  engine="selenium", pipeline=args.pipeline,
+                                  block_profile=args.block_profile[0],
+                                  keep_warm=args.keep_warm, max_rss_mb=args.max_rss_mb,
+                                  track_network=args.track_network, concurrency=controller)
+            start = controller.history[0][0]
+            result["threads"] = "adaptive"
+            result["limits"] = [[round(t - start, 2), limit, reason]
+                                for t, limit, reason in controller.history]
+            print(json.dumps(result, ensure_ascii=False))
+            runs.append(result)
+    finally:
+        close_all()
+        server.stop()
+    return runs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Офлайн-бенчмарк скрапера на локальному сервері")
+    parser.add_argument("--places", type=int, default=60, help="кількість місць у стрічці")
+    parser.add_argument("--max-threads", type=int, default=4, help="масштабування 1..N потоків")
+    parser.add_argument("--engine", nargs="+", default=["selenium"],
+                        choices=["selenium", "http", "cdp"], help="один або кілька рушіїв для порівняння")
+    parser.add_argument("--tabs", type=int, default=4, help="вкладок у браузері для рушія cdp")
+    parser.add_argument("--discovery", default="feed", choices=["feed", "tiled"])
+    parser.add_argument("--tile-zoom", type=int, default=13)
+    parser.add_argument("--feed-cap", type=int, default=120,
+                        help="максимум записів у стрічці пошуку на сервері (міста або області)")
+    parser.add_argument("--pipeline", action="store_true")
+    parser.add_argument("--block-profile", nargs="+", default=["light"],
+                        help="профілі блокування ресурсів (кожен — окремий набір запусків)")
+    parser.add_argument("--track-network", action="store_true",
+                        help="запити, КБ і заблоковані запити кожної сторінки в JSON")
+    parser.add_argument("--latency-ms", type=int, default=100)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--load-latency-ms", type=int, default=0,
+                        help="затримка сервера росте з кількістю одночасних запитів")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="додатковий запуск з адаптивною кількістю потоків")
+    parser.add_argument("--latency-target", type=float, default=8.0,
+                        help="p95 часу сторінки, вище якого адаптивний режим зменшує потоки")
+    parser.add_argument("--max-rss-mb", type=int, default=None,
+                        help="перезапускати браузер між сторінками, якщо він займає більше пам'яті")
+    parser.add_argument("--keep-warm", action="store_true", help="не закривати пул між запусками")
+    parser.add_argument("--export-rows", type=int, default=5000,
+                        help="розмір таблиці для вимірювання експорту (0 — пропустити)")
+    parser.add_argument("--only-exports", action="store_true")
+    parser.add_argument("--startup-runs", type=int, default=3,
+                        help="кількість вимірювань холодного старту (0 — пропустити)")
+    parser.add_argument("--parity-places", type=int, default=10,
+                        help="сторінок для звірки parse_place_html з EXTRACT_SCRIPT (0 — без звірки)")
+    parser.add_argument("--out", default=None, help="шлях до JSON з результатами")
+    args = parser.parse_args(argv)
+
+    exports = []
+    if args.export_rows:
+        exports = bench_exports(args.export_rows)
+        for result in exports:
+            print(json.dumps(result, ensure_ascii=False))
+
+    startup = []
+    if args.startup_runs and not args.only_exports:
+        startup = bench_startup(args.startup_runs)
+
+    parity = None
+    if args.parity_places and not args.only_exports:
+        parity = bench_parity(args.parity_places)
+
+    runs = []
+    if not args.only_exports:
+        runs = run_scaling(args)
+
+    report = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+        "runs": runs,
+        "exports": exports,
+        "startup": startup,
+        "parity": parity,
+    }
+
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        out = os.path.join(RESULTS_DIR, f"bench_{stamp}_{report['revision'] or 'local'}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Результати збережено: {out}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
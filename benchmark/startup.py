@@ -0,0 +1,44 @@
+import json
+import os
+import sys
+import time
+
+# запускається окремим процесом (python -m benchmark.startup <адреса сервера>),
+# щоб вимірювати холодний старт: імпорт модулів, пошук chromedriver і першу навігацію
+start = time.perf_counter()
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scraper  # noqa: E402
+
+import_seconds = time.perf_counter() - start
+
+
+def measure(server_url):
+    scraper.MAPS_URL = f"{server_url}/maps"
+    result = {"import_scraper_s": round(import_seconds, 3),
+              "pandas_loaded_on_import": "pandas" in sys.modules}
+
+    t = time.perf_counter()
+    scraper.chromedriver_path()
+    result["chromedriver_path_first_s"] = round(time.perf_counter() - t, 3)
+    t = time.perf_counter()
+    scraper.chromedriver_path()
+    result["chromedriver_path_cached_s"] = round(time.perf_counter() - t, 4)
+
+    t = time.perf_counter()
+    driver = scraper.get_driver(True)
+    result["driver_start_s"] = round(time.perf_counter() - t, 3)
+    try:
+        t = time.perf_counter()
+        scraper.check_city_exists(driver, "Львів")
+        result["first_navigation_s"] = round(time.perf_counter() - t, 3)
+    finally:
+        driver.quit()
+
+    result["time_to_first_navigation_s"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+if __name__ == "__main__":
+    print(json.dumps(measure(sys.argv[1]), ensure_ascii=False))
@@ -0,0 +1,258 @@
+import asyncio
+import itertools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+
+from extract import EXTRACT_SCRIPT, build_record
+from network import BLOCK_PROFILES
+from run_log import add_span
+from work_queue import WorkerStats
+
+
+class CdpError(Exception):
+    pass
+
+
+# EXTRACT_SCRIPT написано для execute_async_script: тут він обгорнутий у Promise,
+# щоб Runtime.evaluate повернув ті самі сирі дані, що й браузерні потоки
+def extract_expression(name_timeout=5, details_timeout=2):
+    return ("new Promise(resolve => (function() {" + EXTRACT_SCRIPT + "})("
+            f"{int(name_timeout * 1000)}, {int(details_timeout * 1000)}, resolve))")
+
+
+# одне websocket-з'єднання DevTools з браузером; вкладки — це сесії (flatten)
+class CdpConnection:
+    def __init__(self, ws):
+        self._ws = ws
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._waiters = []
+        self.closed = False
+        self._reader = asyncio.create_task(self._read())
+
+    # адресу DevTools браузера, запущеного chromedriver, віддає сам драйвер
+    @classmethod
+    async def connect(cls, http, debugger_address):
+        async with http.get(f"http://{debugger_address}/json/version") as response:
+            info = await response.json(content_type=None)
+        ws = await http.ws_connect(info["webSocketDebuggerUrl"], max_msg_size=0)
+        return cls(ws)
+
+    async def _read(self):
+        try:
+            async for message in self._ws:
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    break
+                data = json.loads(message.data)
+                if "id" in data:
+                    future = self._pending.pop(data["id"], None)
+                    if future is None or future.done():
+                        continue
+                    if "error" in data:
+                        future.set_exception(CdpError(data["error"].get("message", "")))
+                    else:
+                        future.set_result(data.get("result", {}))
+                    continue
+
+                key = (data.get("method"), data.get("sessionId"))
+                for waiter in list(self._waiters):
+                    if waiter[:2] == key and not waiter[2].done():
+                        waiter[2].set_result(data.get("params", {}))
+                        self._waiters.remove(waiter)
+        finally:
+            self.closed = True
+            error = CdpError("з'єднання з браузером закрито")
+            for future in list(self._pending.values()) + [w[2] for w in self._waiters]:
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+            self._waiters.clear()
+
+    async def send(self, method, params=None, session_id=None, timeout=30):
+        if self.closed:
+            raise CdpError("з'єднання з браузером закрито")
+        message_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        try:
+            await self._ws.send_str(json.dumps(message))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(message_id, None)
+
+    # подію треба очікувати ще до команди, яка її викликає
+    def expect(self, method, session_id=None):
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((method, session_id, future))
+        return future
+
+    def forget(self, future):
+        self._waiters = [w for w in self._waiters if w[2] is not future]
+
+    async def close(self):
+        await self._ws.close()
+        try:
+            await self._reader
+        except Exception:
+            pass
+
+
+# одна вкладка браузера зі своєю сесією DevTools
+class CdpTab:
+    def __init__(self, connection, target_id, session_id):
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+
+    @classmethod
+    async def open(cls, connection, block_patterns=None):
+        target = await connection.send("Target.createTarget", {"url": "about:blank"})
+        attached = await connection.send(
+            "Target.attachToTarget", {"targetId": target["targetId"], "flatten": True})
+        tab = cls(connection, target["targetId"], attached["sessionId"])
+        await tab.send("Page.enable")
+        # блокування з network.BLOCK_PROFILES діє на кожну вкладку окремо
+        if block_patterns:
+            await tab.send("Network.enable")
+            await tab.send("Network.setBlockedURLs", {"urls": block_patterns})
+        return tab
+
+    async def send(self, method, params=None, timeout=30):
+        return await self.connection.send(method, params, self.session_id, timeout)
+
+    # як page_load_strategy='eager': чекаємо лише на DOMContentLoaded
+    async def navigate(self, url, timeout=20):
+        loaded = self.connection.expect("Page.domContentEventFired", self.session_id)
+        try:
+            result = await self.send("Page.navigate", {"url": url}, timeout)
+            if result.get("errorText"):
+                raise CdpError(result["errorText"])
+            await asyncio.wait_for(loaded, timeout)
+        except asyncio.TimeoutError:
+            await self.send("Page.stopLoading")
+        finally:
+            self.connection.forget(loaded)
+
+    async def extract(self, name_timeout=5, details_timeout=2, timings=None):
+        result = await self.send("Runtime.evaluate", {
+            "expression": extract_expression(name_timeout, details_timeout),
+            "awaitPromise": True,
+            "returnByValue": True,
+        }, timeout=name_timeout + details_timeout + 10)
+        if "exceptionDetails" in result:
+            raise CdpError(result["exceptionDetails"].get("text", "помилка скрипта"))
+        raw = result.get("result", {}).get("value") or {}
+        if timings is not None:
+            timings.update(raw.get("timings") or {})
+        return build_record(raw)
+
+    async def close(self):
+        try:
+            await self.connection.send("Target.closeTarget", {"targetId": self.target_id}, timeout=5)
+        except Exception:
+            pass
+
+
+async def _consume(tab, name, driver, pool, url_queue, getter, stats, records, log, on_record):
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            wait_start = time.time()
+            url = await loop.run_in_executor(getter, url_queue.get)
+            stats.idle += time.time() - wait_start
+            if url is None:
+                return
+
+            page_start = time.time()
+            timings = {}
+            try:
+                await tab.navigate(url)
+                add_span("navigate", time.time() - page_start)
+                pool.mark_page(driver)
+
+                extract_start = time.time()
+                record = await tab.extract(timings=timings)
+                add_span("extract", time.time() - extract_start)
+            except Exception as e:
+                log(f"{name}: помилка обробки сторінки: {e}")
+                if url_queue.retry(url):
+                    stats.retries += 1
+                else:
+                    stats.failures += 1
+                stats.busy += time.time() - page_start
+                if tab.connection.closed:
+                    # браузер закрився: посилання вже повернуто в чергу для інших вкладок
+                    log(f"{name}: браузер недоступний, вкладка зупиняється")
+                    return
+                continue
+
+            for phase in ("h1", "rating", "contacts"):
+                if timings.get(phase) is not None:
+                    add_span(f"wait_{phase}", timings[phase] / 1000)
+            stats.pages += 1
+            stats.busy += time.time() - page_start
+            url_queue.done(url)
+
+            if not record:
+                log(f"{name}: пропускаю — немає назви")
+                continue
+            log(f"{name}: {record['Назва']}")
+            records.append(record)
+            if stats.first_record is None:
+                stats.first_record = time.time()
+            if on_record:
+                on_record(url, record, time.time() - page_start)
+    finally:
+        await tab.close()
+
+
+async def _run(drivers, pool, url_queue, tabs_per_browser, block_profile, stats, records, log, on_record):
+    patterns = BLOCK_PROFILES.get(block_profile, [])
+    connections = []
+    # окремі потоки для блокуючого url_queue.get, щоб не займати цикл подій
+    with ThreadPoolExecutor(max_workers=len(drivers) * tabs_per_browser) as getter:
+        async with aiohttp.ClientSession() as http:
+            try:
+                workers = []
+                for b, driver in enumerate(drivers, 1):
+                    address = driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+                    connection = await CdpConnection.connect(http, address)
+                    connections.append(connection)
+                    tabs = await asyncio.gather(*(CdpTab.open(connection, patterns)
+                                                  for _ in range(tabs_per_browser)))
+                    workers.extend(
+                        _consume(tab, f"Tab-{b}.{t}", driver, pool, url_queue, getter,
+                                 stats, records, log, on_record)
+                        for t, tab in enumerate(tabs, 1))
+                await asyncio.gather(*workers)
+            finally:
+                for connection in connections:
+                    await connection.close()
+
+
+# потік CDP-рушія: кілька браузерів з пулу, у кожному tabs_per_browser вкладок,
+# усі вкладки обробляють сторінки одночасно з одного циклу подій
+def cdp_worker(url_queue, pool, browsers=2, tabs_per_browser=4, block_profile="light",
+               log=print, on_record=None):
+    stats = WorkerStats("cdp")
+    records = []
+    log(f"Thread-cdp: старт роботи, браузерів: {browsers}, вкладок у кожному: {tabs_per_browser}")
+    drivers = []
+    try:
+        # по одному, щоб при помилці повернути в пул уже видані драйвери
+        for _ in range(browsers):
+            drivers.append(pool.lease())
+        asyncio.run(_run(drivers, pool, url_queue, tabs_per_browser, block_profile,
+                         stats, records, log, on_record))
+    finally:
+        for driver in drivers:
+            pool.release(driver)
+        stats.finish()
+        log("Thread-cdp: роботу завершено")
+    return records, stats
@@ -0,0 +1,103 @@
+import threading
+import time
+
+from run_log import current_run, percentile
+
+
+# рішення пишуться в журнал запуску, з якого викликано observe()
+def _log(message):
+    run = current_run.get()
+    if run:
+        run.log(message)
+    else:
+        print(message)
+
+
+# AIMD-регулятор кількості активних потоків обробки:
+# поки сторінки відкриваються швидко і без збоїв, ліміт росте на increase_step,
+# при зростанні затримки, таймаутах або перезапусках браузера — множиться на decrease_factor
+class AimdController:
+    def __init__(self, min_workers=1, max_workers=5, initial=None, window=8,
+                 latency_target=8.0, timeout_limit=0.2, restart_limit=0.1,
+                 increase_step=1, decrease_factor=0.5, log=None):
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        self.limit = min(max(initial or self.min_workers, self.min_workers), self.max_workers)
+        self.window = window
+        self.latency_target = latency_target
+        self.timeout_limit = timeout_limit
+        self.restart_limit = restart_limit
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.history = [(time.time(), self.limit, "старт")]
+        self._log = log or _log
+        self._latencies = []
+        self._timeouts = 0
+        self._restarts = 0
+        self._failures = 0
+        self._cond = threading.Condition()
+
+    # результат однієї сторінки; рішення приймається після кожних window сторінок
+    def observe(self, seconds, timed_out=False, restarted=False, failed=False):
+        with self._cond:
+            self._latencies.append(seconds)
+            self._timeouts += bool(timed_out)
+            self._restarts += bool(restarted)
+            self._failures += bool(failed)
+            if len(self._latencies) >= self.window:
+                self._decide()
+
+    def _decide(self):
+        pages = len(self._latencies)
+        p50 = percentile(self._latencies, 50)
+        p95 = percentile(self._latencies, 95)
+        timeout_rate = self._timeouts / pages
+        restart_rate = self._restarts / pages
+        failure_rate = self._failures / pages
+        self._latencies = []
+        self._timeouts = self._restarts = self._failures = 0
+
+        reasons = []
+        if p95 > self.latency_target:
+            reasons.append(f"p95 {p95:.1f} с > {self.latency_target:.1f} с")
+        if timeout_rate > self.timeout_limit:
+            reasons.append(f"таймаути {timeout_rate * 100:.0f}%")
+        if restart_rate > self.restart_limit:
+            reasons.append(f"перезапуски {restart_rate * 100:.0f}%")
+
+        previous = self.limit
+        if reasons:
+            self.limit = max(self.min_workers, int(self.limit * self.decrease_factor))
+            action = "зменшую"
+        else:
+            self.limit = min(self.max_workers, self.limit + self.increase_step)
+            action = "збільшую"
+            reasons.append(f"p95 {p95:.1f} с")
+        if self.limit == previous:
+            action = "залишаю"
+
+        reason = ", ".join(reasons)
+        self.history.append((time.time(), self.limit, reason))
+        self._log(f"Потоки: {action} {previous} -> {self.limit} "
+                  f"(сторінок {pages}, p50 {p50:.1f} с, {reason}, "
+                  f"помилок {failure_rate * 100:.0f}%)")
+        self._cond.notify_all()
+
+    # потік з номером більшим за ліміт чекає, поки ліміт не зросте або робота не закінчиться
+    # потік поза лімітом буде чекати в wait_turn
+    def parked(self, worker_id):
+        with self._cond:
+            return worker_id > self.limit
+
+    def wait_turn(self, worker_id, url_queue, poll=0.5):
+        with self._cond:
+            while worker_id > self.limit:
+                if url_queue.finished():
+                    return False
+                self._cond.wait(poll)
+        return True
+
+    def summary(self):
+        limits = [limit for _, limit, _ in self.history]
+        return (f"Потоки: рішень {len(self.history) - 1}, "
+                f"ліміт зараз {self.limit}, мінімум {min(limits)}, максимум {max(limits)}")
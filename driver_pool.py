@@ -0,0 +1,205 @@
+import threading
+import time
+import atexit
+
+
+# ознаки того, що браузер "помер" і його треба перезапустити
+CRASH_MARKERS = ("out of memory", "timed out receiving")
+
+
+def is_crash_error(error):
+    text = str(error).lower()
+    return any(marker in text for marker in CRASH_MARKERS)
+
+
+# пул "прогрітих" браузерів, які видаються потокам і повертаються назад
+class DriverPool:
+    def __init__(self, factory, max_idle=5, max_pages=50, log=print):
+        self._factory = factory
+        self._max_idle = max_idle
+        self._max_pages = max_pages
+        self._log = log
+        self._idle = []
+        self._pages = {}
+        self._live = {}
+        self._recycle = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _create(self):
+        driver = self._factory()
+        with self._lock:
+            self._pages[id(driver)] = 0
+            self._live[id(driver)] = driver
+        return driver
+
+    def _quit(self, driver):
+        with self._lock:
+            self._pages.pop(id(driver), None)
+            self._live.pop(id(driver), None)
+            self._recycle.discard(id(driver))
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    # перевірка, що браузер ще відповідає
+    def _is_healthy(self, driver):
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    # видача драйвера: спочатку з вільних, інакше створюємо новий
+    def lease(self):
+        while True:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                return self._create()
+            if self.needs_recycle(driver):
+                self._quit(driver)
+                continue
+            if self._is_healthy(driver):
+                return driver
+            self._log("Пул: драйвер не відповідає, закриваю")
+            self._quit(driver)
+
+    # повернення драйвера в пул або закриття, якщо він відпрацював своє
+    def release(self, driver):
+        with self._lock:
+            # драйвер, який вже перезапустили або закрили, назад не приймаємо
+            known = id(driver) in self._pages
+            pages = self._pages.get(id(driver), 0)
+            keep = (known and not self._closed and pages < self._max_pages
+                    and id(driver) not in self._recycle
+                    and len(self._idle) < self._max_idle)
+            if keep:
+                self._idle.append(driver)
+        if not keep:
+            self._quit(driver)
+
+    # лічильник сторінок для планового перезапуску драйвера
+    def mark_page(self, driver):
+        with self._lock:
+            self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+            return self._pages[id(driver)]
+
+    def page_count(self, driver):
+        with self._lock:
+            return self._pages.get(id(driver), 0)
+
+    def needs_recycle(self, driver):
+        with self._lock:
+            return (self._pages.get(id(driver), 0) >= self._max_pages
+                    or id(driver) in self._recycle)
+
+    # позначка для перезапуску між сторінками (наприклад, браузер з'їв забагато пам'яті)
+    def request_recycle(self, driver):
+        with self._lock:
+            if id(driver) in self._live:
+                self._recycle.add(id(driver))
+
+    # заміна завислого або відпрацьованого драйвера на новий
+    def restart(self, driver, delay=0):
+        self._quit(driver)
+        if delay:
+            time.sleep(delay)
+        return self._create()
+
+    # попереднє створення браузерів, щоб наступний пошук стартував швидше
+    def warm(self, count):
+        with self._lock:
+            missing = min(count, self._max_idle) - len(self._idle)
+        if missing <= 0:
+            return
+
+        created = []
+
+        def create_one():
+            try:
+                created.append(self._create())
+            except Exception as e:
+                self._log(f"Пул: не вдалося створити драйвер: {e}")
+
+        threads = [threading.Thread(target=create_one) for _ in range(missing)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for driver in created:
+            self.release(driver)
+
+    # фоновий прогрів, поки основний потік робить іншу роботу
+    def warm_async(self, count):
+        t = threading.Thread(target=self.warm, args=(count,), daemon=True)
+        t.start()
+        return t
+
+    # усі живі драйвери пулу (вільні і видані)
+    def drivers(self):
+        with self._lock:
+            return list(self._live.values())
+
+    def idle_count(self):
+        with self._lock:
+            return len(self._idle)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            drivers, self._idle = self._idle, []
+        for driver in drivers:
+            self._quit(driver)
+
+
+# той самий пул, але кожен виданий драйвер спершу налаштовується (наприклад, профіль
+# блокування ресурсів): браузери спільні, тому налаштування не входить у ключ пулу
+class ConfiguredPool:
+    def __init__(self, pool, configure):
+        self._pool = pool
+        self._configure = configure
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+
+    def _prepare(self, driver):
+        try:
+            self._configure(driver)
+        except Exception:
+            # драйвер, який не вдалося налаштувати, у пул не повертається
+            self._pool.request_recycle(driver)
+            self._pool.release(driver)
+            raise
+        return driver
+
+    def lease(self):
+        return self._prepare(self._pool.lease())
+
+    def restart(self, driver, delay=0):
+        return self._prepare(self._pool.restart(driver, delay))
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+# спільний пул на процес, щоб наступні пошуки використовували ті самі браузери
+def get_pool(key, factory, **kwargs):
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = DriverPool(factory, **kwargs)
+            _pools[key] = pool
+        return pool
+
+
+def close_all():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_all)
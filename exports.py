@@ -0,0 +1,46 @@
+import io
+
+import pandas as pd
+
+# формат: (MIME-тип, розширення файлу)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def csv_bytes(df):
+    return df.to_csv(index=False).encode("utf-8")
+
+
+# Excel у режимі write_only: рядки пишуться потоком, без моделі всієї книги в пам'яті
+def excel_bytes(df):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append([str(c) for c in df.columns])
+    for row in df.itertuples(index=False, name=None):
+        sheet.append([None if pd.isna(v) else v for v in row])
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def parquet_bytes(df):
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+EXPORTERS = {
+    "csv": csv_bytes,
+    "xlsx": excel_bytes,
+    "parquet": parquet_bytes,
+}
+
+
+def export_bytes(df, fmt):
+    return EXPORTERS[fmt](df)
@@ -0,0 +1,247 @@
+import re
+from html.parser import HTMLParser
+
+
+# скрипт, який за один виклик чекає на сторінку місця і збирає всі сирі дані
+# повертає словник: назва, текст рейтингу, категорія і кнопки з data-item-id
+EXTRACT_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const nameTimeout = arguments[0];
+const detailsTimeout = arguments[1];
+const start = Date.now();
+let nameFound = null;
+let ratingFound = null;
+let contactsFound = null;
+
+function collect() {
+    const h1 = document.querySelector('h1');
+    const rating = document.querySelector('div.F7nice');
+    const category = document.querySelector('button[jsaction*="category"]');
+    const items = Array.from(document.querySelectorAll('[data-item-id]')).map(el => ({
+        id: el.getAttribute('data-item-id'),
+        text: el.innerText || '',
+        href: el.getAttribute('href') ? el.href : '',
+        aria: el.getAttribute('aria-label') || '',
+        tag: el.tagName.toLowerCase()
+    }));
+    return {
+        name: h1 ? h1.innerText : '',
+        rating: rating ? rating.textContent : '',
+        category: category ? category.innerText : '',
+        items: items,
+        timings: {
+            h1: nameFound === null ? null : nameFound - start,
+            rating: ratingFound === null ? null : ratingFound - start,
+            contacts: contactsFound === null ? null : contactsFound - start
+        }
+    };
+}
+
+function poll() {
+    const now = Date.now();
+    if (nameFound === null) {
+        if (document.querySelector('h1')) {
+            nameFound = now;
+        } else if (now - start > nameTimeout) {
+            done({name: '', rating: '', category: '', items: []});
+            return;
+        }
+    }
+    if (nameFound !== null) {
+        if (ratingFound === null && document.querySelector('div.F7nice')) {
+            ratingFound = now;
+        }
+        if (contactsFound === null && document.querySelector('[data-item-id]')) {
+            contactsFound = now;
+        }
+        const ready = ratingFound !== null && contactsFound !== null;
+        if (ready || now - nameFound > detailsTimeout) {
+            done(collect());
+            return;
+        }
+    }
+    setTimeout(poll, 100);
+}
+poll();
+"""
+
+# колонки запису місця у порядку, в якому їх показує застосунок
+RECORD_COLUMNS = ["Назва", "Рейтинг", "Відгуки", "Категорія", "Адреса", "Номер тел", "Вебсайт"]
+
+# іконки Google Maps, які потрапляють у текст кнопок
+ICON_CHARS = re.compile('[\ue000-\uf8ff]')
+
+
+# перетворення сирих даних сторінки на запис (спільне для браузера і HTML)
+def build_record(raw):
+    name = (raw.get("name") or "").strip()
+    if not name:
+        return None
+
+    # рейтинг і кількість відгуків з тексту блоку div.F7nice
+    rating_text, reviews_text = "", ""
+    full_text = raw.get("rating") or ""
+    matches = re.findall(r'(\d+[.,]?\d*)', full_text)
+    if matches:
+        rating_text = matches[0].replace('.', ',')
+
+    review_match = re.search(r'\((.*?)\)', full_text)
+    if review_match:
+        reviews_text = review_match.group(1).replace(
+            ' ', '').replace(u'\xa0', '')  # чистка пробілів
+
+    category = (raw.get("category") or "").strip()
+
+    # адреса, телефон і сайт з кнопок [data-item-id]
+    address, phone, website = "", "", ""
+    items = raw.get("items") or []
+    for item in items:
+        item_id = item.get("id")
+        text = item.get("text") or ""
+        if not item_id:
+            continue
+        if item_id == "address":
+            lines = [ICON_CHARS.sub('', line).strip() for line in text.split('\n')]
+            raw_addr = ', '.join(line for line in lines if line)
+            address = f"{category} {raw_addr}" if category else raw_addr
+        elif item_id.startswith("phone:"):
+            phone = item_id.replace("phone:", "").replace("tel:", "").strip()
+        elif item_id == "authority":
+            website = item.get("href") or text
+
+    if not address:
+        for item in items:
+            if item.get("tag") == "button" and "address" in (item.get("id") or ""):
+                address = (item.get("aria") or "").replace("Адреса: ", "")
+                break
+
+    return {
+        "Назва": name,
+        "Рейтинг": rating_text,
+        "Відгуки": reviews_text,
+        "Категорія": category,
+        "Адреса": address,
+        "Номер тел": phone,
+        "Вебсайт": website
+    }
+
+
+# збір усього запису місця одним запитом до chromedriver
+# timings (словник) отримує час появи h1, рейтингу і контактів у мс
+def extract_place(driver, name_timeout=5, details_timeout=2, timings=None):
+    raw = driver.execute_async_script(
+        EXTRACT_SCRIPT, int(name_timeout * 1000), int(details_timeout * 1000))
+    raw = raw or {}
+    if timings is not None:
+        timings.update(raw.get("timings") or {})
+    return build_record(raw)
+
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input",
+             "link", "meta", "source", "track", "wbr"}
+
+
+# розбір збереженої сторінки місця без браузера
+class PlacePageParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.raw = {"name": "", "rating": "", "category": "", "items": []}
+        self._captures = []
+        self._skip = 0
+        self._seen = set()
+
+    def _start(self, kind, target):
+        self._captures.append({"kind": kind, "depth": 1, "chunks": [], "target": target})
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip += 1
+            return
+
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+
+        if tag not in VOID_TAGS:
+            for capture in self._captures:
+                capture["depth"] += 1
+        else:
+            return
+
+        if tag == "h1" and "name" not in self._seen:
+            self._seen.add("name")
+            self._start("name", None)
+        elif tag == "div" and "F7nice" in classes and "rating" not in self._seen:
+            self._seen.add("rating")
+            self._start("rating", None)
+        elif (tag == "button" and "category" in (attrs.get("jsaction") or "")
+                and "category" not in self._seen):
+            self._seen.add("category")
+            self._start("category", None)
+
+        if "data-item-id" in attrs:
+            item = {
+                "id": attrs.get("data-item-id"),
+                "text": "",
+                "href": attrs.get("href") or "",
+                "aria": attrs.get("aria-label") or "",
+                "tag": tag
+            }
+            self.raw["items"].append(item)
+            self._start("item", item)
+
+    def handle_startendtag(self, tag, attrs):
+        pass
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self._skip = max(0, self._skip - 1)
+            return
+        if tag in VOID_TAGS:
+            return
+
+        finished = []
+        for capture in self._captures:
+            capture["depth"] -= 1
+            if capture["depth"] <= 0:
+                finished.append(capture)
+        for capture in finished:
+            self._captures.remove(capture)
+            self._finish(capture)
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        for capture in self._captures:
+            capture["chunks"].append(data)
+
+    def _finish(self, capture):
+        chunks = capture["chunks"]
+        if capture["kind"] == "rating":
+            # як textContent: текст без розділювачів
+            self.raw["rating"] = "".join(chunks)
+            return
+
+        # як innerText: окремі текстові блоки через новий рядок
+        text = "\n".join(c.strip() for c in chunks if c.strip())
+        if capture["kind"] == "item":
+            capture["target"]["text"] = text
+        else:
+            self.raw[capture["kind"]] = text
+
+    def close(self):
+        super().close()
+        for capture in list(self._captures):
+            self._finish(capture)
+        self._captures = []
+
+
+def parse_place_raw(html):
+    parser = PlacePageParser()
+    parser.feed(html)
+    parser.close()
+    return parser.raw
+
+
+# той самий запис, що й extract_place, але з page_source
+def parse_place_html(html):
+    return build_record(parse_place_raw(html))
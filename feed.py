@@ -0,0 +1,197 @@
+import time
+
+from place_cache import place_id_from_url
+
+# кінець стрічки результатів: окремий блок з текстом "кінець списку"
+END_MARKER_SCRIPT = """
+function feedEnded(feed) {
+    if (feed.querySelector('span.HlvSq')) {
+        return true;
+    }
+    // перевіряємо лише останні блоки, щоб не читати текст усієї стрічки
+    let node = feed.lastElementChild;
+    for (let i = 0; node && i < 3; i++, node = node.previousElementSibling) {
+        const text = node.textContent || '';
+        if (text.includes('Ви досягли кінця списку') ||
+                text.includes("You've reached the end of the list")) {
+            return true;
+        }
+    }
+    return false;
+}
+"""
+
+# нові елементи списку: обходимо лише ті, що додані після попереднього виклику,
+# і позначаємо їх, щоб не повертати двічі; readItem повертає null для елементів,
+# які ще не готові — наступний виклик почне з першого такого елемента
+HARVEST_FUNCTION = """
+function harvest(list) {
+    const elements = list.getElementsByClassName(ITEM_CLASS);
+    let start = list.__harvested || 0;
+    if (start > elements.length) {
+        start = 0;  // список перемальовано
+    }
+    const items = [];
+    let pending = -1;
+    for (let i = start; i < elements.length; i++) {
+        const el = elements[i];
+        if (el.hasAttribute('data-harvested')) {
+            continue;
+        }
+        const item = readItem(el);
+        if (item === null) {
+            if (pending < 0) {
+                pending = i;
+            }
+            continue;
+        }
+        el.setAttribute('data-harvested', '1');
+        if (item) {
+            items.push(item);
+        }
+    }
+    list.__harvested = pending < 0 ? elements.length : pending;
+    return items;
+}
+
+function state(list, timedOut) {
+    return {
+        items: harvest(list),
+        count: list.getElementsByClassName(ITEM_CLASS).length,
+        end: listEnded(list),
+        timed_out: timedOut
+    };
+}
+"""
+
+# прокрутка списку і очікування нових елементів через MutationObserver
+# повертається одразу, щойно з'явилися нові елементи або маркер кінця списку,
+# і в тому ж виклику віддає нові елементи
+SCROLL_AND_WAIT_FUNCTION = """
+const list = arguments[0];
+const previous = arguments[1];
+const timeout = arguments[2];
+const done = arguments[arguments.length - 1];
+
+function ready() {
+    return list.getElementsByClassName(ITEM_CLASS).length > previous || listEnded(list);
+}
+
+list.scrollTop = list.scrollHeight;
+if (ready()) {
+    done(state(list, false));
+} else {
+    let finished = false;
+    const observer = new MutationObserver(() => {
+        if (!finished && ready()) {
+            finished = true;
+            observer.disconnect();
+            done(state(list, false));
+        }
+    });
+    observer.observe(list, {childList: true, subtree: true});
+    setTimeout(() => {
+        if (!finished) {
+            finished = true;
+            observer.disconnect();
+            done(state(list, true));
+        }
+    }, timeout);
+}
+"""
+
+
+# пара скриптів (разовий збір, прокрутка з очікуванням) для списку з елементами item_class;
+# read_item і ended — тексти JS-функцій readItem(el) і listEnded(list)
+def harvest_scripts(item_class, read_item, ended):
+    prefix = f"const ITEM_CLASS = {item_class!r};\n" + read_item + ended + HARVEST_FUNCTION
+    return (prefix + "return state(arguments[0], false);\n",
+            prefix + SCROLL_AND_WAIT_FUNCTION)
+
+
+READ_LINK_FUNCTION = """
+function readItem(a) {
+    return a.tagName === 'A' ? a.href : null;
+}
+"""
+
+HARVEST_SCRIPT, SCROLL_AND_WAIT_SCRIPT = harvest_scripts(
+    "hfpxzc", READ_LINK_FUNCTION,
+    END_MARKER_SCRIPT + "function listEnded(list) { return feedEnded(list); }\n")
+
+
+# спільна частина збирачів списків: дедуплікація за ключем елемента у множині;
+# підкласи задають key(), take() (запис або None) і full()
+class ListHarvester:
+    harvest_script = HARVEST_SCRIPT
+    scroll_script = SCROLL_AND_WAIT_SCRIPT
+
+    def __init__(self):
+        self.count = 0
+        self._seen = set()
+
+    def _accept(self, result):
+        self.count = result["count"]
+        new_items = []
+        for item in result["items"]:
+            if self.full():
+                break
+            key = self.key(item)
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            taken = self.take(item)
+            if taken is not None:
+                new_items.append(taken)
+        return new_items, result
+
+    def harvest(self, driver, container):
+        return self._accept(driver.execute_script(self.harvest_script, container))
+
+    # один крок прокрутки з очікуванням на події DOM
+    def scroll_and_harvest(self, driver, container, timeout=3.0):
+        start = time.time()
+        result = driver.execute_async_script(
+            self.scroll_script, container, self.count, int(timeout * 1000))
+        new_items, result = self._accept(result)
+        return new_items, result, time.time() - start
+
+    def scroll(self, driver, container):
+        driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", container)
+
+
+# збирач посилань стрічки: дедуплікація за ідентифікатором місця,
+# порядок появи зберігається у списку
+class FeedHarvester(ListHarvester):
+    def __init__(self, max_results):
+        super().__init__()
+        self.max_results = max_results
+        self.links = []
+
+    def full(self):
+        return len(self.links) >= self.max_results
+
+    def key(self, url):
+        return place_id_from_url(url)
+
+    def take(self, url):
+        self.links.append(url)
+        return url
+
+
+# статистика очікування на кожному кроці прокрутки
+class WaitStats:
+    def __init__(self, mode):
+        self.mode = mode
+        self.steps = []
+
+    def add(self, seconds):
+        self.steps.append(seconds)
+
+    def summary(self):
+        if not self.steps:
+            return f"Очікування прокрутки ({self.mode}): кроків не було"
+        total = sum(self.steps)
+        return (f"Очікування прокрутки ({self.mode}): кроків {len(self.steps)}, "
+                f"всього {total:.1f} сек, в середньому {total / len(self.steps):.2f} сек, "
+                f"максимум {max(self.steps):.2f} сек")
@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import pandas as pd
+
+HISTORY_DIR = "history"
+
+
+# історія пошуків на диску (Parquet + журнал), у пам'яті лише N останніх відкритих
+# записи належать власнику (сесії застосунку): кожен бачить і очищає лише свої
+class HistoryStore:
+    def __init__(self, root=HISTORY_DIR, max_in_memory=5):
+        self.root = root
+        self.max_in_memory = max_in_memory
+        self._index_path = os.path.join(root, "index.json")
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        os.makedirs(root, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    # запис індексу через тимчасовий файл, щоб не зіпсувати його при падінні
+    def _save_index(self):
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self._index_path)
+
+    def _remember(self, key, entry):
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_in_memory:
+            self._cache.popitem(last=False)
+
+    def _find(self, owner, key):
+        for meta in self._index:
+            if meta.get("owner") == owner and meta["key"] == key:
+                return meta
+        return None
+
+    def _remove_files(self, entry_id):
+        for suffix in (".parquet", ".log.json"):
+            try:
+                os.remove(os.path.join(self.root, entry_id + suffix))
+            except OSError:
+                pass
+
+    # ключі власника від найновішого до найстарішого
+    def keys(self, owner):
+        with self._lock:
+            return [meta["key"] for meta in reversed(self._index) if meta.get("owner") == owner]
+
+    def add(self, owner, key, df, logs, **meta):
+        entry_id = uuid.uuid4().hex[:12]
+        df.to_parquet(os.path.join(self.root, f"{entry_id}.parquet"), index=False)
+        with open(os.path.join(self.root, f"{entry_id}.log.json"), "w", encoding="utf-8") as f:
+            json.dump(logs, f, ensure_ascii=False)
+
+        with self._lock:
+            self._index.append(dict(meta, owner=owner, key=key, id=entry_id,
+                                    rows=len(df), created=time.time()))
+            self._save_index()
+            self._remember((owner, key), {"df": df, "logs": logs})
+
+    # старі записи підвантажуються з диску лише тоді, коли їх відкрили
+    # запис без файлу даних (видалений вручну, пошкоджений) прибирається з індексу
+    def get(self, owner, key):
+        with self._lock:
+            if (owner, key) in self._cache:
+                self._cache.move_to_end((owner, key))
+                return self._cache[(owner, key)]
+            meta = self._find(owner, key)
+        if meta is None:
+            return None
+
+        try:
+            df = pd.read_parquet(os.path.join(self.root, f"{meta['id']}.parquet"))
+        except (OSError, ValueError):
+            with self._lock:
+                self._index = [m for m in self._index if m["id"] != meta["id"]]
+                self._save_index()
+            self._remove_files(meta["id"])
+            return None
+        try:
+            with open(os.path.join(self.root, f"{meta['id']}.log.json"), encoding="utf-8") as f:
+                logs = json.load(f)
+        except (OSError, ValueError):
+            logs = []
+
+        entry = {"df": df, "logs": logs}
+        with self._lock:
+            self._remember((owner, key), entry)
+        return entry
+
+    # видалення лише записів цього власника
+    def clear(self, owner):
+        with self._lock:
+            removed = [m for m in self._index if m.get("owner") == owner]
+            self._index = [m for m in self._index if m.get("owner") != owner]
+            for meta in removed:
+                self._cache.pop((owner, meta["key"]), None)
+            self._save_index()
+        for meta in removed:
+            self._remove_files(meta["id"])
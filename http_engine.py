@@ -0,0 +1,111 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+
+from extract import parse_place_html
+from run_log import add_span
+from work_queue import UrlQueue, WorkerStats
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "uk,en;q=0.8",
+    "Accept": "text/html,application/xhtml+xml",
+}
+# без цього cookie Google у ЄС віддає сторінку згоди замість сторінки місця
+COOKIES = {"CONSENT": "YES+"}
+
+
+async def fetch_html(session, url):
+    async with session.get(url) as response:
+        response.raise_for_status()
+        return await response.text()
+
+
+async def _consume(session, url_queue, fallback_queue, getter, stats, records, log, on_record):
+    loop = asyncio.get_running_loop()
+    while True:
+        wait_start = time.time()
+        url = await loop.run_in_executor(getter, url_queue.get)
+        stats.idle += time.time() - wait_start
+        if url is None:
+            return
+
+        page_start = time.time()
+        try:
+            html = await fetch_html(session, url)
+            add_span("fetch", time.time() - page_start)
+        except Exception as e:
+            log(f"Thread-http: не вдалося завантажити сторінку: {e}")
+            if not url_queue.retry(url):
+                # після кількох невдалих спроб віддаємо сторінку браузеру
+                stats.failures += 1
+                fallback_queue.put(url)
+            else:
+                stats.retries += 1
+            stats.busy += time.time() - page_start
+            continue
+
+        parse_start = time.time()
+        record = parse_place_html(html)
+        add_span("parse", time.time() - parse_start)
+        stats.pages += 1
+        stats.busy += time.time() - page_start
+        url_queue.done(url)
+
+        if record:
+            log(f"Thread-http: {record['Назва']}")
+            records.append(record)
+            if stats.first_record is None:
+                stats.first_record = time.time()
+            if on_record:
+                on_record(url, record, time.time() - page_start)
+        else:
+            log("Thread-http: сторінку не вдалося розібрати, передаю браузеру")
+            stats.failures += 1
+            fallback_queue.put(url)
+
+
+async def _run(url_queue, fallback_queue, concurrency, stats, records, log, on_record):
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=20)
+    # окремі потоки для блокуючого url_queue.get, щоб не займати цикл подій
+    with ThreadPoolExecutor(max_workers=concurrency) as getter:
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers=HEADERS, cookies=COOKIES) as session:
+            await asyncio.gather(*(
+                _consume(session, url_queue, fallback_queue, getter, stats, records, log, on_record)
+                for _ in range(concurrency)
+            ))
+
+
+# потік HTTP-рушія: бере посилання з черги, а нерозібрані віддає у fallback_queue
+def http_worker(url_queue, fallback_queue, concurrency=20, log=print, on_record=None):
+    stats = WorkerStats("http")
+    records = []
+    log(f"Thread-http: старт роботи, з'єднань: {concurrency}")
+    try:
+        asyncio.run(_run(url_queue, fallback_queue, concurrency, stats, records, log, on_record))
+    finally:
+        # браузерні потоки чекають на fallback_queue, поки її не закрито
+        fallback_queue.close()
+        stats.finish()
+        log("Thread-http: роботу завершено")
+    return records, stats
+
+
+# обробка списку посилань без браузера; повертає записи і нерозібрані посилання
+def fetch_records(urls, concurrency=20, log=print):
+    url_queue = UrlQueue(max_retries=1)
+    url_queue.put_many(urls)
+    url_queue.close()
+    fallback_queue = UrlQueue()
+    records, _ = http_worker(url_queue, fallback_queue, concurrency, log)
+
+    failed = []
+    while fallback_queue.pending():
+        url = fallback_queue.get()
+        failed.append(url)
+        fallback_queue.done(url)
+    return records, failed
@@ -0,0 +1,111 @@
+import json
+import threading
+
+# шаблони URL для блокування через Network.setBlockedURLs (підтримують *)
+ANALYTICS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*/gen_204*",
+    "*/log?*",
+    "*/csi?*",
+]
+FONTS = [
+    "*fonts.gstatic.com*",
+    "*fonts.googleapis.com*",
+    "*.woff2*",
+    "*.woff*",
+    "*.ttf*",
+]
+MEDIA = [
+    "*/maps/vt*",
+    "*/kh/v=*",
+    "*streetviewpixels*",
+    "*googleusercontent.com*",
+    "*ggpht.com*",
+    "*youtube.com*",
+    "*.png*",
+    "*.jpg*",
+    "*.jpeg*",
+    "*.gif*",
+    "*.webp*",
+    "*.svg*",
+]
+
+BLOCK_PROFILES = {
+    "none": [],
+    "light": ANALYTICS + FONTS,
+    "aggressive": ANALYTICS + FONTS + MEDIA,
+}
+
+
+# вмикає блокування запитів через CDP на конкретному драйвері
+def apply_blocklist(driver, profile="light"):
+    patterns = BLOCK_PROFILES.get(profile, [])
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+
+# розбір performance-логу chromedriver: кількість запитів, байти і заблоковані запити
+def drain_network_log(driver):
+    requests, received, blocked = 0, 0, 0
+    for entry in driver.get_log("performance"):
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        method = message.get("method")
+        params = message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            requests += 1
+        elif method == "Network.loadingFinished":
+            received += params.get("encodedDataLength", 0)
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            blocked += 1
+    return requests, received, blocked
+
+
+# сумарна мережева статистика за запуск (спільна для всіх потоків)
+class NetworkStats:
+    def __init__(self, profile):
+        self.profile = profile
+        self.pages = 0
+        self.requests = 0
+        self.bytes = 0
+        self.blocked = 0
+        self.seconds = 0.0
+        # по кожній сторінці: запити, КБ, заблоковано
+        self.per_page = []
+        self._lock = threading.Lock()
+
+    def add_page(self, requests, received, blocked, seconds):
+        with self._lock:
+            self.per_page.append({"requests": requests, "kb": round(received / 1024, 1),
+                                  "blocked": blocked})
+            self.pages += 1
+            self.requests += requests
+            self.bytes += received
+            self.blocked += blocked
+            self.seconds += seconds
+
+    # зведення для JSON бенчмарку
+    def as_dict(self):
+        with self._lock:
+            pages = max(self.pages, 1)
+            return {
+                "profile": self.profile,
+                "pages": self.pages,
+                "requests_per_page": round(self.requests / pages, 1),
+                "kb_per_page": round(self.bytes / pages / 1024, 1),
+                "blocked": self.blocked,
+                "per_page": list(self.per_page),
+            }
+
+    def summary(self):
+        if not self.pages:
+            return f"Мережа (профіль {self.profile}): немає даних"
+        return (f"Мережа (профіль {self.profile}): сторінок {self.pages}, "
+                f"запитів на сторінку {self.requests / self.pages:.1f}, "
+                f"КБ на сторінку {self.bytes / self.pages / 1024:.1f}, "
+                f"заблоковано {self.blocked}, "
+                f"середній час сторінки {self.seconds / self.pages:.2f} сек")
@@ -0,0 +1,84 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import unquote, urlsplit
+
+CACHE_FILE = "place_cache.sqlite3"
+
+# ідентифікатор об'єкта у посиланні: !1s0x...:0x... або !19sChIJ...
+FEATURE_ID = re.compile(r'!1s(0x[0-9a-f]+:0x[0-9a-f]+)', re.IGNORECASE)
+PLACE_ID = re.compile(r'!19s(ChIJ[\w-]+)')
+PLACE_NAME = re.compile(r'/maps/place/([^/?#]+)')
+
+
+# канонічний ідентифікатор місця з посилання /maps/place/
+def place_id_from_url(url):
+    for pattern in (FEATURE_ID, PLACE_ID):
+        match = pattern.search(url)
+        if match:
+            return match.group(1).lower() if pattern is FEATURE_ID else match.group(1)
+
+    match = PLACE_NAME.search(url)
+    if match:
+        return "name:" + unquote(match.group(1)).replace("+", " ")
+
+    parts = urlsplit(url)
+    return parts.netloc + parts.path
+
+
+# постійний кеш записів місць у SQLite з терміном придатності
+class PlaceCache:
+    def __init__(self, path=CACHE_FILE, ttl_hours=24):
+        self.ttl = ttl_hours * 3600
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS places ("
+                "place_id TEXT PRIMARY KEY, url TEXT, record TEXT, "
+                "scrape_seconds REAL, updated_at REAL)"
+            )
+            self._conn.commit()
+
+    # повертає (запис, час збору) для свіжого запису або None
+    def get_fresh(self, place_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record, scrape_seconds FROM places "
+                "WHERE place_id = ? AND updated_at >= ?",
+                (place_id, time.time() - self.ttl)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1] or 0.0
+
+    def put(self, place_id, url, record, scrape_seconds=0.0):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?, ?)",
+                (place_id, url, json.dumps(record, ensure_ascii=False),
+                 scrape_seconds, time.time())
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# облік влучань у кеш протягом одного запуску
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.saved = 0.0
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self):
+        return (f"Кеш: влучань {self.hits} з {self.hits + self.misses} "
+                f"({self.hit_rate() * 100:.0f}%), заощаджено ~{self.saved:.1f} сек")
@@ -0,0 +1,115 @@
+import contextvars
+import threading
+import time
+
+import psutil
+
+
+# сумарна пам'ять (RSS) процесу і всіх його дочірніх процесів у байтах
+def process_tree_rss(pid):
+    try:
+        root = psutil.Process(pid)
+        processes = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return 0
+
+    total = 0
+    for proc in processes:
+        try:
+            total += proc.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+# пам'ять браузера конкретного драйвера (chromedriver + Chrome + його процеси)
+def driver_rss(driver):
+    try:
+        pid = driver.service.process.pid
+    except AttributeError:
+        return 0
+    return process_tree_rss(pid)
+
+
+# фоновий нагляд за пам'яттю браузерів пулу: для кожного драйвера зберігається
+# часова лінія RSS, а драйвер понад max_rss_mb позначається для перезапуску між сторінками
+class MemoryWatchdog:
+    def __init__(self, pool, max_rss_mb=None, interval=1.0, log=print):
+        self._pool = pool
+        self._max_rss = max_rss_mb * 1024 * 1024 if max_rss_mb else None
+        self._interval = interval
+        self._log = log
+        self._stop = threading.Event()
+        self._names = {}
+        self._flagged = set()
+        self._lock = threading.Lock()
+        self._start = time.time()
+        self.timelines = {}
+        self.recycled = 0
+        self._thread = None
+
+    # id() драйвера може повторитися після його закриття, тому ім'я прив'язане до об'єкта
+    def _name(self, driver):
+        key = id(driver)
+        known = self._names.get(key)
+        if known is None or known[0] is not driver:
+            known = (driver, f"driver-{len(self._names) + 1}")
+            self._names[key] = known
+        return known[1]
+
+    def sample(self):
+        for driver in self._pool.drivers():
+            rss = driver_rss(driver)
+            if not rss:
+                continue
+            name = self._name(driver)
+            pages = self._pool.page_count(driver)
+            with self._lock:
+                self.timelines.setdefault(name, []).append(
+                    (round(time.time() - self._start, 2), rss, pages))
+
+            if self._max_rss and rss > self._max_rss and name not in self._flagged:
+                self._flagged.add(name)
+                self.recycled += 1
+                self._pool.request_recycle(driver)
+                self._log(f"Пам'ять: {name} {rss / 1024 / 1024:.0f} МБ після {pages} сторінок, "
+                          f"перезапуск після поточної сторінки")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                self._log(f"Пам'ять: помилка вимірювання: {e}")
+            self._stop.wait(self._interval)
+
+    # потік нагляду пише в той самий журнал запуску, що й потік, який його запустив
+    def start(self):
+        ctx = contextvars.copy_context()
+        self._thread = threading.Thread(target=ctx.run, args=(self._run,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    # часові лінії у форматі для JSON: ім'я -> [(секунда, МБ, сторінок)]
+    def timelines_mb(self):
+        mb = 1024 * 1024
+        with self._lock:
+            return {name: [(t, round(rss / mb, 1), pages) for t, rss, pages in samples]
+                    for name, samples in self.timelines.items()}
+
+    def peaks(self):
+        with self._lock:
+            return [max(rss for _, rss, _ in samples) for samples in self.timelines.values()]
+
+    def summary(self):
+        peaks = self.peaks()
+        if not peaks:
+            return "Пам'ять браузерів: немає вимірювань"
+        return (f"Пам'ять браузерів: драйверів {len(peaks)}, "
+                f"пік {max(peaks) / 1024 / 1024:.0f} МБ, "
+                f"в середньому пік {sum(peaks) / len(peaks) / 1024 / 1024:.0f} МБ, "
+                f"перезапусків через пам'ять {self.recycled}")
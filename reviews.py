@@ -0,0 +1,424 @@
+import argparse
+import csv
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from driver_pool import is_crash_error
+from feed import ListHarvester, harvest_scripts
+from place_cache import place_id_from_url
+from run_log import RunLogger, current_run, submit
+from scraper import ADAPTIVE_TIMEOUTS, log, get_driver_pool
+from sinks import open_sink
+from work_queue import UrlQueue
+
+REVIEW_INDEX_FILE = "review_index.sqlite3"
+REVIEW_COLUMNS = ["ID місця", "ID відгуку", "Автор", "Оцінка", "Дата", "Текст"]
+REVIEW_SELECTOR = "div.jftiEf[data-review-id]"
+# кінець списку — коли завантажено стільки відгуків, скільки вказано в заголовку місця;
+# якщо кількість невідома, кінцем вважаються кілька порожніх очікувань поспіль
+REVIEW_TIMEOUTS = ADAPTIVE_TIMEOUTS[:2]
+
+# вкладка "Відгуки" на сторінці місця
+OPEN_REVIEWS_SCRIPT = """
+const tabs = document.querySelectorAll('button[role="tab"]');
+for (const tab of tabs) {
+    const label = (tab.getAttribute('aria-label') || '') + ' ' + (tab.innerText || '');
+    if (label.includes('Відгуки') || label.includes('Reviews')) {
+        tab.click();
+        return true;
+    }
+}
+return false;
+"""
+
+# прокручувана панель, у якій лежать відгуки
+FIND_PANEL_SCRIPT = """
+let el = document.querySelector(arguments[0]);
+while (el && el !== document.body) {
+    const style = getComputedStyle(el);
+    if (el.scrollHeight > el.clientHeight && /(auto|scroll)/.test(style.overflowY)) {
+        return el;
+    }
+    el = el.parentElement;
+}
+return null;
+"""
+
+# дані одного відгуку; довгий текст Google згортає під кнопку "Більше"
+READ_REVIEW_FUNCTION = """
+function readItem(el) {
+    const id = el.getAttribute('data-review-id');
+    if (!id) {
+        return null;
+    }
+    const more = el.querySelector('button.w8nwRe');
+    if (more) {
+        more.click();
+    }
+    const text = sel => {
+        const node = el.querySelector(sel);
+        return node ? node.innerText || node.textContent || '' : '';
+    };
+    const stars = el.querySelector('.kvMYJc');
+    return {
+        id: id,
+        author: text('.d4r55'),
+        rating: stars ? stars.getAttribute('aria-label') || '' : '',
+        date: text('.rsqaWe'),
+        text: text('.wiI7pd')
+    };
+}
+"""
+
+# загальна кількість відгуків з заголовка місця: "4,5 (1 234)"
+REVIEWS_ENDED_FUNCTION = r"""
+function reviewTotal() {
+    const header = document.querySelector('div.F7nice');
+    const match = header && (header.textContent || '').match(/\(([\d\s\u00a0.,]+)\)/);
+    return match ? parseInt(match[1].replace(/\D/g, ''), 10) || 0 : 0;
+}
+
+// кінець — коли зібрано (а не лише показано) стільки відгуків, скільки в заголовку
+function listEnded(list) {
+    const total = reviewTotal();
+    return total > 0 && list.querySelectorAll('.jftiEf[data-harvested]').length >= total;
+}
+"""
+
+HARVEST_SCRIPT, SCROLL_AND_WAIT_SCRIPT = harvest_scripts(
+    "jftiEf", READ_REVIEW_FUNCTION, REVIEWS_ENDED_FUNCTION)
+
+
+# відгуки, вже зібрані для кожного місця (для режиму "лише нові")
+class ReviewIndex:
+    def __init__(self, path=REVIEW_INDEX_FILE):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS reviews ("
+                "place_id TEXT, review_id TEXT, harvested_at REAL, "
+                "PRIMARY KEY (place_id, review_id))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS harvests ("
+                "place_id TEXT PRIMARY KEY, url TEXT, harvested_at REAL, total INTEGER)"
+            )
+            self._conn.commit()
+
+    def known_ids(self, place_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT review_id FROM reviews WHERE place_id = ?", (place_id,)).fetchall()
+        return {row[0] for row in rows}
+
+    def add(self, place_id, review_ids):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO reviews VALUES (?, ?, ?)",
+                [(place_id, review_id, now) for review_id in review_ids])
+            self._conn.commit()
+
+    def finish(self, place_id, url):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO harvests VALUES (?, ?, ?, "
+                "(SELECT COUNT(*) FROM reviews WHERE place_id = ?))",
+                (place_id, url, time.time(), place_id))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# збирач відгуків одного місця: дедуплікація за ID відгуку
+# known: ID з попередніх зборів (не записуються повторно);
+# stop_at_known: збір зупиняється на першому з них;
+# skip: ID, вже записані цим запуском (наприклад, до повтору після помилки)
+class ReviewHarvester(ListHarvester):
+    harvest_script = HARVEST_SCRIPT
+    scroll_script = SCROLL_AND_WAIT_SCRIPT
+
+    def __init__(self, place_id, known=(), stop_at_known=False, max_reviews=None, skip=()):
+        super().__init__()
+        self.place_id = place_id
+        self.stop_at_known = stop_at_known
+        self.max_reviews = max_reviews
+        self.new = 0
+        self.reached_known = False
+        self._known = set(known)
+        self._skip = set(skip)
+
+    def full(self):
+        if self.stop_at_known and self.reached_known:
+            return True
+        return self.max_reviews is not None and self.new >= self.max_reviews
+
+    def key(self, review):
+        return review["id"]
+
+    def take(self, review):
+        review_id = review["id"]
+        if review_id in self._known:
+            # відгуки відсортовано від нових: далі лише вже зібрані
+            self.reached_known = True
+            return None
+        self.new += 1
+        if review_id in self._skip:
+            return None
+        return {
+            "ID місця": self.place_id,
+            "ID відгуку": review_id,
+            "Автор": review["author"],
+            "Оцінка": review["rating"],
+            "Дата": review["date"],
+            "Текст": review["text"],
+        }
+
+
+# сортування "Найновіші", щоб у режимі incremental нові відгуки йшли першими
+def sort_newest(driver, timeout=5):
+    try:
+        button = driver.find_element(
+            By.CSS_SELECTOR, 'button[aria-label*="Сортувати"], button[aria-label*="Sort"]')
+    except Exception:
+        log("Відгуки: кнопку сортування не знайдено, порядок за замовчуванням")
+        return False
+    button.click()
+    try:
+        item = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable(
+            (By.CSS_SELECTOR, '[role="menuitemradio"][data-index="1"]')))
+    except TimeoutException:
+        log("Відгуки: меню сортування не відкрилось")
+        return False
+    item.click()
+    return True
+
+
+def open_reviews(driver, url, timeout=10):
+    driver.get(url)
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, 'button[role="tab"]')))
+    except TimeoutException:
+        return False
+    return bool(driver.execute_script(OPEN_REVIEWS_SCRIPT))
+
+
+def wait_panel(driver, timeout=10):
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, REVIEW_SELECTOR)))
+    except TimeoutException:
+        return None
+    return driver.execute_script(FIND_PANEL_SCRIPT, REVIEW_SELECTOR)
+
+
+# збір відгуків одного місця; кожна порція нових відгуків одразу пишеться в write_rows
+# skip: ID, уже записані для цього місця (повтор після помилки), вдруге не пишуться
+# повертає кількість нових відгуків
+def harvest_reviews(driver, url, write_rows, index=None, incremental=False, max_reviews=None,
+                    pool=None, skip=()):
+    place_id = place_id_from_url(url)
+    known = index.known_ids(place_id) if index and incremental else ()
+
+    opened = open_reviews(driver, url)
+    if pool is not None:
+        pool.mark_page(driver)
+    if not opened:
+        log(f"Відгуки: вкладку не знайдено ({place_id})")
+        return 0
+    # зупинятися на першому відомому відгуку можна лише при сортуванні від нових;
+    # інакше відомі відгуки просто пропускаються
+    newest_first = False
+    if incremental and known and wait_panel(driver) is not None:
+        first = driver.find_element(By.CSS_SELECTOR, REVIEW_SELECTOR)
+        newest_first = sort_newest(driver)
+        if newest_first:
+            # після сортування список перемальовується заново
+            try:
+                WebDriverWait(driver, 10).until(EC.staleness_of(first))
+            except TimeoutException:
+                log(f"Відгуки: список не оновився після сортування ({place_id})")
+    panel = wait_panel(driver)
+    if panel is None:
+        log(f"Відгуки: список порожній ({place_id})")
+        return 0
+
+    harvester = ReviewHarvester(place_id, known, newest_first, max_reviews, skip)
+
+    def save(rows):
+        if not rows:
+            return
+        write_rows(rows)
+        if index:
+            index.add(place_id, [row["ID відгуку"] for row in rows])
+
+    rows, result = harvester.harvest(driver, panel)
+    save(rows)
+    stalls = 0
+    while not harvester.full() and not result["end"]:
+        timeout = REVIEW_TIMEOUTS[stalls]
+        rows, result, _ = harvester.scroll_and_harvest(driver, panel, timeout)
+        save(rows)
+        if result["timed_out"]:
+            stalls += 1
+            if stalls >= len(REVIEW_TIMEOUTS):
+                break
+        else:
+            stalls = 0
+
+    if index:
+        index.finish(place_id, url)
+    mode = "нові" if incremental and known else "усі"
+    log(f"Відгуки ({mode}): {place_id} — нових {harvester.new}, у списку {harvester.count}")
+    return harvester.new
+
+
+# облік зібраних відгуків за запуск
+class ReviewStats:
+    def __init__(self):
+        self.places = 0
+        self.reviews = 0
+        self.failures = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, new, seconds):
+        with self._lock:
+            self.places += 1
+            self.reviews += new
+            self.seconds += seconds
+
+    def fail(self):
+        with self._lock:
+            self.failures += 1
+
+    def summary(self):
+        average = self.seconds / self.places if self.places else 0.0
+        return (f"Відгуки: місць {self.places}, нових відгуків {self.reviews}, "
+                f"помилок {self.failures}, в середньому {average:.1f} сек на місце")
+
+
+# збір відгуків для списку місць на спільних браузерах
+# incremental=True: для вже оброблених місць збираються лише нові відгуки
+def run_reviews(urls, output="reviews.csv", num_threads=2, is_headless=True, incremental=False,
+                max_reviews=None, index_path=REVIEW_INDEX_FILE, block_profile="light", run_log=None):
+    owns_log = run_log is None
+    if owns_log:
+        run_log = RunLogger()
+    token = current_run.set(run_log)
+    try:
+        return _run_reviews(urls, output, num_threads, is_headless, incremental,
+                            max_reviews, index_path, block_profile)
+    finally:
+        current_run.reset(token)
+        if owns_log:
+            run_log.close()
+
+
+def _run_reviews(urls, output, num_threads, is_headless, incremental, max_reviews,
+                 index_path, block_profile):
+    start_time = time.time()
+    pool = get_driver_pool(is_headless, block_profile)
+    url_queue = UrlQueue(max_retries=1)
+    url_queue.put_many(urls)
+    url_queue.close()
+    index = ReviewIndex(index_path)
+    sink = open_sink(output, REVIEW_COLUMNS)
+    sink_lock = threading.Lock()
+    stats = ReviewStats()
+    # ID відгуків, записаних цим запуском, за місцем: повтор не дублює рядки
+    written = {}
+
+    def write_rows(rows):
+        with sink_lock:
+            for row in rows:
+                sink.write(row)
+                written.setdefault(row["ID місця"], set()).add(row["ID відгуку"])
+
+    def worker():
+        driver = pool.lease()
+        try:
+            while True:
+                url = url_queue.get()
+                if url is None:
+                    return
+                page_start = time.time()
+                try:
+                    if pool.needs_recycle(driver):
+                        driver = pool.restart(driver)
+                    with sink_lock:
+                        skip = set(written.get(place_id_from_url(url), ()))
+                    new = harvest_reviews(driver, url, write_rows, index, incremental,
+                                          max_reviews, pool, skip)
+                    stats.add(new, time.time() - page_start)
+                    url_queue.done(url)
+                except Exception as e:
+                    log(f"Відгуки: помилка для {url}: {e}")
+                    if is_crash_error(e):
+                        driver = pool.restart(driver, delay=2)
+                    if not url_queue.retry(url):
+                        stats.fail()
+        finally:
+            pool.release(driver)
+
+    log(f"Відгуки: місць {len(urls)}, потоків {num_threads}, "
+        f"режим {'лише нові' if incremental else 'усі'}")
+    try:
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            futures = [submit(executor, worker) for _ in range(num_threads)]
+            for future in futures:
+                future.result()
+    finally:
+        url_queue.cancel()
+        sink.close()
+        index.close()
+
+    log(stats.summary())
+    log(f"Загальний час виконання: {time.time() - start_time:.2f} сек")
+    return stats
+
+
+# посилання на місця: текстовий файл (по одному на рядок)
+# або результат пакетного режиму (.csv/.parquet з колонкою "Посилання")
+def load_urls(path):
+    lower = path.lower()
+    if lower.endswith((".parquet", ".pq")):
+        import pandas as pd
+        return [url for url in pd.read_parquet(path, columns=["Посилання"])["Посилання"] if url]
+    if lower.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            return [row["Посилання"] for row in csv.DictReader(f) if row.get("Посилання")]
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Збір відгуків з Google Maps")
+    parser.add_argument("urls", help="файл з посиланнями (.txt) або результат batch.py (.csv/.parquet)")
+    parser.add_argument("--output", default="reviews.csv", help=".csv або .parquet")
+    parser.add_argument("--index", default=REVIEW_INDEX_FILE)
+    parser.add_argument("--incremental", action="store_true",
+                        help="лише відгуки, нові з попереднього збору")
+    parser.add_argument("--max-reviews", type=int, default=None, help="максимум на одне місце")
+    parser.add_argument("--threads", type=int, default=2)
+    parser.add_argument("--block-profile", default="light")
+    parser.add_argument("--show-browser", action="store_true")
+    args = parser.parse_args(argv)
+
+    run_reviews(load_urls(args.urls), args.output, args.threads, not args.show_browser,
+                args.incremental, args.max_reviews, args.index, args.block_profile)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import contextvars
+import datetime
+import math
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+LOG_DIR = "logs"
+# скільки останніх журналів запусків зберігати в LOG_DIR
+MAX_LOG_FILES = 50
+
+# журнал поточного запуску; потоки отримують його через copy_context()
+current_run = contextvars.ContextVar("current_run", default=None)
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    # метод найближчого рангу
+    index = max(0, math.ceil(q / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+# видалення найстаріших журналів, щоб у LOG_DIR лишалось не більше keep файлів
+def prune_logs(directory=LOG_DIR, keep=MAX_LOG_FILES):
+    try:
+        names = [n for n in os.listdir(directory)
+                 if n.startswith("run_") and n.endswith(".txt")]
+    except OSError:
+        return
+    paths = [os.path.join(directory, n) for n in names]
+    paths.sort(key=lambda p: (os.path.getmtime(p), p))
+    for path in paths[:max(0, len(paths) - keep)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# журнал одного запуску: запис у файл у фоновому потоці пакетами
+class RunLogger:
+    def __init__(self, path=None, flush_interval=0.5, echo=True):
+        if path is None:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            # місце під новий журнал
+            prune_logs(LOG_DIR, MAX_LOG_FILES - 1)
+            stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(LOG_DIR, f"run_{stamp}_{uuid.uuid4().hex[:6]}.txt")
+        self.path = path
+        self.entries = []
+        self._echo = echo
+        self._flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._spans = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def log(self, message):
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        entry = f"[{timestamp}] {message}"
+        with self._lock:
+            self.entries.append(entry)
+        self._queue.put(entry)
+
+    # фоновий запис: збираємо все, що накопичилось, і пишемо одним викликом
+    def _write_loop(self):
+        try:
+            f = open(self.path, "a", encoding="utf-8")
+        except Exception:
+            f = None
+
+        running = True
+        while running:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self._flush_interval)
+                batch.append(item)
+                while True:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            if None in batch:
+                running = False
+                batch = [b for b in batch if b is not None]
+            if not batch:
+                continue
+
+            text = "\n".join(batch) + "\n"
+            if self._echo:
+                print(text, end="")
+            if f:
+                try:
+                    f.write(text)
+                    f.flush()
+                except Exception:
+                    pass
+
+        if f:
+            f.close()
+
+    # тривалість однієї фази обробки сторінки
+    def add_span(self, phase, seconds):
+        with self._lock:
+            self._spans.setdefault(phase, []).append(seconds)
+
+    @contextmanager
+    def span(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(phase, time.perf_counter() - start)
+
+    # таблиця p50/p95 по фазах
+    def span_summary(self):
+        with self._lock:
+            spans = {k: list(v) for k, v in self._spans.items()}
+        if not spans:
+            return []
+        lines = [f"{'Фаза':<12} {'к-сть':>6} {'p50, мс':>9} {'p95, мс':>9}"]
+        for phase, values in spans.items():
+            lines.append(f"{phase:<12} {len(values):>6} "
+                         f"{percentile(values, 50) * 1000:>9.0f} "
+                         f"{percentile(values, 95) * 1000:>9.0f}")
+        return lines
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+
+
+# запуск функції в окремому потоці з тим самим журналом
+def submit(executor, fn, *args, **kwargs):
+    ctx = contextvars.copy_context()
+    return executor.submit(ctx.run, fn, *args, **kwargs)
+
+
+def add_span(phase, seconds):
+    run = current_run.get()
+    if run:
+        run.add_span(phase, seconds)
+
+
+@contextmanager
+def span(phase):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_span(phase, time.perf_counter() - start)
@@ -0,0 +1,54 @@
+import pandas as pd
+
+# типи колонок таблиці результатів
+SCHEMA = {
+    "Назва": "string",
+    "Рейтинг": "float64",
+    "Відгуки": "int32",
+    "Категорія": "category",
+    "Місто": "category",
+    "Адреса": "string",
+    "Номер тел": "string",
+    "Вебсайт": "string",
+}
+COLUMNS = list(SCHEMA.keys())
+
+
+# приведення колонок до типів SCHEMA одним проходом по кожній колонці
+# (безпечно викликати повторно для вже нормалізованої таблиці)
+def normalize_frame(df):
+    df = df.copy()
+    for column in COLUMNS:
+        if column not in df.columns:
+            df[column] = None
+
+    if not pd.api.types.is_float_dtype(df["Рейтинг"]):
+        df["Рейтинг"] = pd.to_numeric(
+            df["Рейтинг"].astype("string").str.extract(r'(\d+[.,]?\d*)', expand=False)
+            .str.replace(',', '.', regex=False),
+            errors="coerce"
+        )
+    df["Рейтинг"] = df["Рейтинг"].fillna(0.0).astype("float64")
+
+    if not pd.api.types.is_integer_dtype(df["Відгуки"]):
+        df["Відгуки"] = pd.to_numeric(
+            df["Відгуки"].astype("string").str.replace(r'\D', '', regex=True),
+            errors="coerce"
+        )
+    df["Відгуки"] = df["Відгуки"].fillna(0).astype("int32")
+
+    for column in ("Назва", "Адреса", "Номер тел", "Вебсайт"):
+        df[column] = df[column].astype("string").fillna("")
+    for column in ("Категорія", "Місто"):
+        df[column] = df[column].astype("string").fillna("").astype("category")
+
+    extra = [c for c in df.columns if c not in SCHEMA]
+    return df[COLUMNS + extra]
+
+
+# таблиця з записів скрапера; city додається до кожного запису
+def to_frame(records, city=None):
+    df = pd.DataFrame(list(records))
+    if city is not None:
+        df["Місто"] = city
+    return normalize_frame(df)
@@ -1,10 +1,11 @@
 import time
-import re
 import random
 import datetime
-import pandas as pd
 import subprocess
+import queue
 import os
+import threading
+from functools import lru_cache
 from concurrent.futures import ThreadPoolExecutor
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -13,26 +14,48 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
-
-execution_logs = []
-LOG_FILE = "live_logs.txt"
-
-# функція для запису логів у список і файл
+from driver_pool import ConfiguredPool, get_pool, is_crash_error
+from work_queue import UrlQueue, WorkerStats
+from extract import extract_place
+from place_cache import PlaceCache, CacheStats, place_id_from_url
+from network import NetworkStats, apply_blocklist, drain_network_log
+from feed import WaitStats, FeedHarvester
+from sinks import open_sink
+from run_log import RunLogger, current_run, submit, span, add_span
+from procmem import MemoryWatchdog
+from tiles import TILE_FEED_CAP, city_tiles, subdivide, tile_url, viewport_from_url
+
+# адреса Google Maps; бенчмарк підміняє її на локальний сервер
+MAPS_URL = os.environ.get("MAPS_BASE_URL", "https://www.google.com/maps")
+# таймаути очікування нових записів у стрічці (зростають при затримках)
+ADAPTIVE_TIMEOUTS = (3, 6, 12)
+
+# функція для запису логів у журнал поточного запуску
+# поза запуском (наприклад, під час прогріву пулу) повідомлення лише друкуються
 def log(message):
-    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-    entry = f"[{timestamp}] {message}"
-    execution_logs.append(entry)
-    print(entry)
+    run = current_run.get()
+    if run:
+        run.log(message)
+        return
 
-    try:
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(entry + "\n")
-    except Exception:
-        pass
+    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+# шлях до chromedriver визначається один раз на процес:
+# ChromeDriverManager().install() щоразу перевіряє версію (і може ходити в мережу)
+# CHROMEDRIVER_PATH дозволяє взагалі обійтися без webdriver_manager
+@lru_cache(maxsize=None)
+def chromedriver_path():
+    path = os.environ.get("CHROMEDRIVER_PATH")
+    if path:
+        return path
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
 
 # функція для створення драйвера браузера
-def get_driver(is_headless=False):
+# block_profile: набір заблокованих ресурсів (див. network.BLOCK_PROFILES)
+# track_network: вмикає performance-лог для підрахунку запитів і байтів
+def get_driver(is_headless=False, block_profile="light", track_network=False):
     options = webdriver.ChromeOptions()
     if is_headless:
         options.add_argument("--headless=new")
@@ -48,16 +71,33 @@ def get_driver(is_headless=False):
     options.add_argument("--lang=uk")
     options.add_argument("--log-level=3")
     options.page_load_strategy = 'eager'
+    if track_network:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
 
     driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
+        service=Service(chromedriver_path()),
         options=options
     )
     # driver.set_page_load_timeout(20)
+    if block_profile and block_profile != "none":
+        apply_blocklist(driver, block_profile)
     return driver
 
+# спільний пул браузерів для конкретного режиму (headless чи ні)
+# у ключі лише налаштування запуску браузера; профіль блокування застосовується
+# до драйвера при кожній видачі, тож зміна профілю не запускає новий набір браузерів
+def get_driver_pool(is_headless=False, block_profile="light", track_network=False):
+    pool = get_pool(
+        ("chrome", is_headless, track_network),
+        lambda: get_driver(is_headless, "none", track_network),
+        max_idle=5,
+        max_pages=50,
+        log=log
+    )
+    return ConfiguredPool(pool, lambda driver: apply_blocklist(driver, block_profile or "none"))
+
 def check_city_exists(driver, city_name):
-    driver.get(f"https://www.google.com/maps/search/{city_name}")
+    driver.get(f"{MAPS_URL}/search/{city_name}")
     try:
         WebDriverWait(driver, 5).until(EC.url_contains("/place/"))
         return True
@@ -65,256 +105,605 @@ def check_city_exists(driver, city_name):
         log(f"Місто '{city_name}' не знайдено.")
         return False
 
-# функція для обробки групи посилань
-def scrape_batch(urls, is_headless=False, thread_id=1, external_driver=None):
+# функція для збору даних з однієї відкритої сторінки місця
+# усі поля збираються одним скриптом, без окремих запитів на кожен елемент
+def scrape_place(driver, thread_id=1):
+    timings = {}
+    with span("extract"):
+        record = extract_place(driver, timings=timings)
+    # час появи елементів від початку очікування (мс із браузера)
+    for phase in ("h1", "rating", "contacts"):
+        if timings.get(phase) is not None:
+            add_span(f"wait_{phase}", timings[phase] / 1000)
+
+    if not record:
+        log(f"Thread-{thread_id}: пропускаю — немає назви")
+        return None
+
+    log(f"Thread-{thread_id}: {record['Назва']}")
+    return record
+
+# потік, який бере посилання зі спільної черги по одному
+# on_record(url, record, seconds) викликається для кожного зібраного запису
+# net_stats: якщо передано, для кожної сторінки рахуються запити і байти
+# controller: AimdController; потік працює, лише поки його номер не більший за ліміт
+def scrape_worker(url_queue, is_headless=False, thread_id=1, external_driver=None, on_record=None, pool=None, net_stats=None, controller=None):
+    pool = pool or get_driver_pool(is_headless)
     # Якщо передали зовнішній драйвер (для 1 потоку), використовуємо його
-    if external_driver:
-        driver = external_driver
-        owns_driver = False  # Прапор, що цей драйвер не треба закривати тут
-    else:
-        driver = get_driver(is_headless)
-        owns_driver = True
+    # Інакше драйвер береться з пулу лише тоді, коли з'явиться перше посилання
+    driver = external_driver
+    owns_driver = False  # Прапор, що цей драйвер не треба повертати в пул тут
 
     batch_data = []
-    log(f"Thread-{thread_id}: старт роботи. Посилань: {len(urls)}")
+    stats = WorkerStats(thread_id)
+    log(f"Thread-{thread_id}: старт роботи")
 
     try:
-        for url in urls:
+        while True:
+            wait_start = time.time()
+            # зменшення кількості потоків має звільняти пам'ять: браузер потоку,
+            # що стає на паузу, закривається, а після паузи береться новий з пулу
+            if controller and controller.parked(thread_id) and owns_driver and driver is not None:
+                log(f"Thread-{thread_id}: пауза, закриваю браузер")
+                pool.request_recycle(driver)
+                pool.release(driver)
+                driver = None
+                owns_driver = False
+            if controller and not controller.wait_turn(thread_id, url_queue):
+                break
+            url = url_queue.get()
+            stats.idle += time.time() - wait_start
+            if url is None:
+                break
+
+            page_start = time.time()
+            timed_out = restarted = failed = False
             try:
-                driver.get(url)
-            except TimeoutException:
-                driver.execute_script("window.stop();")
-            except Exception as e:
-                if "out of memory" in str(e).lower() or "timed out receiving" in str(e).lower():
-                    log(f"Thread-{thread_id}: зависання браузера, перезапускаю")
-                    try:
-                        driver.quit()
-                    except:
-                        pass
-                    time.sleep(2)
-                    # Тут ми змушені створити новий, навіть якщо був external_driver, бо старий "помер"
-                    driver = get_driver(is_headless)
-                    owns_driver = True  # Тепер ми власники нового драйвера
-                    continue
-                else:
-                    log(f"Thread-{thread_id}: не вдалося відкрити сторінку: {e}")
-                    continue
+                if driver is None:
+                    driver = pool.lease()
+                    owns_driver = True
 
-            # time.sleep(random.uniform(1.0, 2.0))
+                # плановий перезапуск драйвера після N сторінок
+                if pool.needs_recycle(driver):
+                    log(f"Thread-{thread_id}: плановий перезапуск драйвера")
+                    driver = pool.restart(driver)
+                    owns_driver = True
 
-            # намагаємося взяти назву об'єкта
-            try:
-                name_elem = WebDriverWait(driver, 5).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "h1"))
-                )
-                name = name_elem.text
-            except:
-                name = "Без назви"
-
-            if not name or name.strip() == "" or name == "Без назви":
-                log(f"Thread-{thread_id}: пропускаю — немає назви")
-                continue
+                if net_stats:
+                    drain_network_log(driver)  # відкидаємо запити попередньої сторінки
 
-            # намагаємося взяти рейтинг і кількість відгуків
-            rating_text, reviews_text = "", ""
-            try:
-                rating_div = WebDriverWait(driver, 2).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'div.F7nice'))
-                )
-                full_text = rating_div.get_attribute('textContent')
-
-                matches = re.findall(r'(\d+[.,]?\d*)', full_text)
-                if matches:
-                    rating_text = matches[0].replace('.', ',')
-
-                review_match = re.search(r'\((.*?)\)', full_text)
-                if review_match:
-                    reviews_text = review_match.group(1).replace(
-                        ' ', '').replace(u'\xa0', '')  # чистка пробілів
-            except:
-                pass
-
-            # намагаємося взяти категорію
-            category = ""
-            try:
-                cat_btn = driver.find_element(
-                    By.CSS_SELECTOR, 'button[jsaction*="category"]'
-                )
-                category = cat_btn.text
-            except:
-                pass
-
-            # збираємо адресу, телефон і сайт
-            address, phone, website = "", "", ""
-            try:
-                WebDriverWait(driver, 2).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, '[data-item-id]'))
-                )
-            except:
-                pass
-
-            actions = driver.find_elements(By.CSS_SELECTOR, '[data-item-id]')
-            for btn in actions:
-                item_id = btn.get_attribute('data-item-id')
-                text = btn.text
-                if not item_id:
-                    continue
-                if item_id == "address":
-                    raw_addr = text.replace('\n', ', ').replace('', '').strip()
-                    address = f"{category} {raw_addr}" if category else raw_addr
-                elif item_id.startswith("phone:"):
-                    phone = item_id.replace("phone:", "").replace("tel:", "").strip()
-                elif item_id == "authority":
-                    website = btn.get_attribute('href') or text
-
-            if not address:
                 try:
-                    addr_elem = driver.find_element(
-                        By.CSS_SELECTOR, 'button[data-item-id*="address"]'
-                    )
-                    address = addr_elem.get_attribute(
-                        "aria-label").replace("Адреса: ", "")
-                except:
-                    pass
+                    with span("navigate"):
+                        driver.get(url)
+                except TimeoutException:
+                    timed_out = True
+                    driver.execute_script("window.stop();")
+                except Exception as e:
+                    if is_crash_error(e):
+                        log(f"Thread-{thread_id}: зависання браузера, перезапускаю")
+                        # Тут ми змушені створити новий, навіть якщо був external_driver, бо старий "помер"
+                        driver = pool.restart(driver, delay=2)
+                        owns_driver = True  # Тепер ми власники нового драйвера
+                        restarted = True
+                    else:
+                        log(f"Thread-{thread_id}: не вдалося відкрити сторінку: {e}")
+                    failed = True
+                    requeue(url_queue, url, stats, thread_id)
+                    continue
 
-            log(f"Thread-{thread_id}: {name}")
-            batch_data.append({
-                "Назва": name,
-                "Рейтинг": rating_text,
-                "Відгуки": reviews_text,
-                "Адреса": address,
-                "Номер тел": phone,
-                "Вебсайт": website
-            })
+                pool.mark_page(driver)
+
+                record = scrape_place(driver, thread_id)
+                # назва так і не з'явилась за name_timeout
+                timed_out = timed_out or record is None
+                if net_stats:
+                    net_stats.add_page(*drain_network_log(driver),
+                                       time.time() - page_start)
+                if record:
+                    batch_data.append(record)
+                    if stats.first_record is None:
+                        stats.first_record = time.time()
+                    if on_record:
+                        on_record(url, record, time.time() - page_start)
+                stats.pages += 1
+                url_queue.done(url)
+            except Exception as e:
+                log(f"Thread-{thread_id}: помилка обробки сторінки: {e}")
+                failed = True
+                requeue(url_queue, url, stats, thread_id)
+            finally:
+                stats.busy += time.time() - page_start
+                if controller:
+                    controller.observe(time.time() - page_start, timed_out, restarted, failed)
 
     finally:
+        stats.finish()
         log(f"Thread-{thread_id}: роботу завершено")
-        # Закриваємо драйвер ТІЛЬКИ якщо ми його створювали всередині цієї функції
-        if owns_driver:
-            driver.quit()
+        # Повертаємо драйвер у пул ТІЛЬКИ якщо ми його брали всередині цієї функції
+        if owns_driver and driver is not None:
+            pool.release(driver)
+
+    return batch_data, stats
 
+# повертаємо посилання в чергу або здаємося після кількох спроб
+def requeue(url_queue, url, stats, thread_id):
+    if url_queue.retry(url):
+        stats.retries += 1
+        log(f"Thread-{thread_id}: повертаю посилання в чергу")
+    else:
+        stats.failures += 1
+        log(f"Thread-{thread_id}: пропускаю посилання після кількох спроб: {url}")
+
+# функція для обробки групи посилань
+def scrape_batch(urls, is_headless=False, thread_id=1, external_driver=None):
+    url_queue = UrlQueue()
+    url_queue.put_many(urls)
+    url_queue.close()
+    batch_data, _ = scrape_worker(url_queue, is_headless, thread_id, external_driver)
     return batch_data
 
-# основна функція для збору даних з Google Maps
-def get_google_maps_data(target_object, target_city, max_results=10, num_threads=1, is_headless=False, show_console=False):
-    start_time = time.time()
-    execution_logs.clear()
+# прокрутка стрічки, поки не зібрано harvester.max_results посилань або не досягнуто кінця списку
+# повертає True, якщо on_link зупинив збір
+def scroll_feed(driver, scrollable_div, harvester, on_link=None, wait_mode="adaptive"):
+    wait_stats = WaitStats(wait_mode)
+    new_links, result = harvester.harvest(driver, scrollable_div)
+    previous_cnt = 0
+    stalls = 0
+    while True:
+        stopped = False
+        for url in new_links:
+            # on_link повертає False, якщо збір вже зупинено
+            if on_link and on_link(url) is False:
+                stopped = True
+                break
 
-    # очищаємо файл логів перед стартом
-    with open(LOG_FILE, "w", encoding="utf-8") as f:
-        f.write("Start scraping\n")
+        if stopped:
+            log("Пошук посилань зупинено")
+            break
+        if harvester.full():
+            break
+
+        if wait_mode == "adaptive":
+            # таймаут росте, лише якщо нові записи довго не з'являються
+            timeout = ADAPTIVE_TIMEOUTS[min(stalls, len(ADAPTIVE_TIMEOUTS) - 1)]
+            previous = harvester.count
+            new_links, result, waited = harvester.scroll_and_harvest(
+                driver, scrollable_div, timeout)
+            wait_stats.add(waited)
+            if result["end"] and result["count"] <= previous and not new_links:
+                log("Досягнуто кінця списку")
+                break
+            if result["timed_out"]:
+                stalls += 1
+                if stalls >= len(ADAPTIVE_TIMEOUTS):
+                    log("Нові результати не з'являються, завершую прокрутку")
+                    break
+            else:
+                stalls = 0
+            continue
+
+        step_wait = 0.0
+        if harvester.count == previous_cnt and harvester.count > 0:
+            time.sleep(2)
+            step_wait += 2
+            new_links, result = harvester.harvest(driver, scrollable_div)
+            wait_stats.add(step_wait)
+            if harvester.count == previous_cnt:
+                break
+            # нові записи з'явились під час паузи — обробляємо їх на наступному кроці
+            continue
 
-    # якщо потрібен живий перегляд логів у PowerShell
-    if show_console:
-        try:
-            cmd = f'start powershell -NoExit -Command "Get-Content -Path \'{LOG_FILE}\' -Wait -Encoding UTF8"'
-            subprocess.Popen(cmd, shell=True)
-        except Exception as e:
-            log(f"Не вдалося відкрити PowerShell: {e}")
+        previous_cnt = harvester.count
+        harvester.scroll(driver, scrollable_div)
+        time.sleep(1.5)
+        wait_stats.add(step_wait + 1.5)
+        new_links, result = harvester.harvest(driver, scrollable_div)
 
-    log(f"Параметри пошуку: '{target_object}' у '{target_city}'")
 
-    driver = get_driver(is_headless)
-    if not check_city_exists(driver, target_city):
-        driver.quit()
-        return pd.DataFrame(), execution_logs
-    links_to_visit = []
+    log(wait_stats.summary())
+    return stopped
 
-    try:
+# функція для пошуку посилань на місця у стрічці результатів
+# on_link викликається для кожного нового посилання, щойно воно з'явилося
+# wait_mode="adaptive": чекаємо на появу нових записів замість фіксованих пауз
+# city_loaded=True: сторінку міста вже відкрив check_city_exists на цьому драйвері
+def discover_links(driver, target_object, target_city, max_results, on_link=None, wait_mode="adaptive", city_loaded=False):
+    if not city_loaded:
         log(f"Відкриваю місто: '{target_city}'")
-        driver.get(f"https://www.google.com/maps/search/{target_city}")
+        driver.get(f"{MAPS_URL}/search/{target_city}")
 
-        wait = WebDriverWait(driver, 15)
-        search_box = wait.until(EC.element_to_be_clickable((By.ID, "searchboxinput")))
-        driver.execute_script("arguments[0].value = '';", search_box)
+    wait = WebDriverWait(driver, 15)
+    search_box = wait.until(EC.element_to_be_clickable((By.ID, "searchboxinput")))
+    driver.execute_script("arguments[0].value = '';", search_box)
 
-        log(f"Вводжу запит: '{target_object}'")
-        search_box.send_keys(target_object)
-        search_box.send_keys(Keys.ENTER)
+    log(f"Вводжу запит: '{target_object}'")
+    search_box.send_keys(target_object)
+    search_box.send_keys(Keys.ENTER)
 
-        try:
-            wait.until(EC.presence_of_element_located(
-                (By.CSS_SELECTOR, 'div[role="feed"]')))
-        except TimeoutException:
-            log("Список не завантажився. Перевіряю наявність помилки пошуку.")
+    try:
+        wait.until(EC.presence_of_element_located(
+            (By.CSS_SELECTOR, 'div[role="feed"]')))
+    except TimeoutException:
+        log("Список не завантажився. Перевіряю наявність помилки пошуку.")
 
-            page_source = driver.page_source
-            if "Google Карти не можуть знайти" in page_source or "Google Maps can't find" in page_source:
-                log(f"За запитом '{target_object}' нічого не знайдено.")
-                driver.quit()
-                return pd.DataFrame(), execution_logs
+        page_source = driver.page_source
+        if "Google Карти не можуть знайти" in page_source or "Google Maps can't find" in page_source:
+            log(f"За запитом '{target_object}' нічого не знайдено.")
+            return []
 
-            try:
-                search_btn = driver.find_element(By.ID, "searchbox-searchbutton")
-                search_btn.click()
+        try:
+            search_btn = driver.find_element(By.ID, "searchbox-searchbutton")
+            search_btn.click()
+            if wait_mode == "adaptive":
+                try:
+                    WebDriverWait(driver, 10).until(EC.presence_of_element_located(
+                        (By.CSS_SELECTOR, 'div[role="feed"]')))
+                except TimeoutException:
+                    pass
+            else:
                 time.sleep(3)
-                if len(driver.find_elements(By.CSS_SELECTOR, 'div[role="feed"]')) == 0:
-                    driver.quit()
-                    return pd.DataFrame(), execution_logs
-            except:
-                log(f"За запитом '{target_object}' нічого не знайдено.")
-                driver.quit()
-                return pd.DataFrame(), execution_logs
-
-        scrollable_div = driver.find_element(By.CSS_SELECTOR, 'div[role="feed"]')
-        previous_cnt = 0
-        while len(links_to_visit) < max_results:
-            elements = driver.find_elements(By.CSS_SELECTOR, 'a.hfpxzc')
-            for elem in elements:
-                url = elem.get_attribute('href')
-                if url and url not in links_to_visit:
-                    links_to_visit.append(url)
-
-            if len(links_to_visit) >= max_results:
-                break
-
-            if len(elements) == previous_cnt and len(elements) > 0:
-                time.sleep(2)
-                new_elems = driver.find_elements(By.CSS_SELECTOR, 'a.hfpxzc')
-                if len(new_elems) == previous_cnt:
-                    break
-
-            previous_cnt = len(elements)
-            driver.execute_script(
-                "arguments[0].scrollTop = arguments[0].scrollHeight", scrollable_div)
-            time.sleep(1.5)
-
-        links_to_visit = links_to_visit[:max_results]
-        log(f"Зібрано посилань: {len(links_to_visit)}")
+            if len(driver.find_elements(By.CSS_SELECTOR, 'div[role="feed"]')) == 0:
+                return []
+        except:
+            log(f"За запитом '{target_object}' нічого не знайдено.")
+            return []
+
+    scrollable_div = driver.find_element(By.CSS_SELECTOR, 'div[role="feed"]')
+    harvester = FeedHarvester(max_results)
+    scroll_feed(driver, scrollable_div, harvester, on_link, wait_mode)
+    links_to_visit = harvester.links
+    log(f"Зібрано посилань: {len(links_to_visit)}")
+    return links_to_visit
+
+# пошук у межах однієї області карти: стрічка відкривається одразу за адресою з @широта,довгота
+# повертає (кількість записів у стрічці, чи зупинив збір on_link)
+def discover_tile(driver, target_object, tile, on_link=None, wait_mode="adaptive", feed_cap=TILE_FEED_CAP):
+    driver.get(tile_url(MAPS_URL, target_object, tile))
+    try:
+        WebDriverWait(driver, 15).until(EC.presence_of_element_located(
+            (By.CSS_SELECTOR, 'div[role="feed"]')))
+    except TimeoutException:
+        # у області немає місць (або одне місце відкрилось одразу)
+        return 0, False
+
+    scrollable_div = driver.find_element(By.CSS_SELECTOR, 'div[role="feed"]')
+    harvester = FeedHarvester(feed_cap)
+    stopped = scroll_feed(driver, scrollable_div, harvester, on_link, wait_mode)
+    return harvester.count, stopped
+
+# пошук посилань по областях карти: видима область міста ділиться на квадрати,
+# які обробляються паралельно кількома браузерами; квадрат, стрічка якого
+# впирається в ліміт feed_cap, ділиться на чотири менші (не глибше max_depth)
+# driver: браузер, який вже відкрив місто, працює як один з потоків
+def discover_tiled(pool, target_object, viewport, max_results, on_link=None, workers=2, tile_zoom=14, wait_mode="adaptive", feed_cap=TILE_FEED_CAP, max_depth=3, driver=None):
+    tiles = city_tiles(viewport, tile_zoom)
+    log(f"Пошук по областях: {len(tiles)} областей масштабу {tiles[0].zoom}, потоків {workers}")
+    tile_queue = UrlQueue(max_retries=1)
+    tile_queue.put_many(tiles)
+    tile_queue.close()
+
+    links = []
+    seen = set()
+    lock = threading.Lock()
+    tile_counts = {"done": 0, "split": 0}
+
+    # дедуплікація за ідентифікатором місця між усіма областями
+    def accept(url):
+        place_id = place_id_from_url(url)
+        with lock:
+            if len(links) >= max_results:
+                return False
+            if place_id in seen:
+                return True
+            seen.add(place_id)
+            links.append(url)
+            full = len(links) >= max_results
+        if (on_link and on_link(url) is False) or full:
+            tile_queue.cancel()
+            return False
+        return True
 
-    except Exception as e:
-        log(f"Критична помилка: {e}")
-        driver.quit()
-        return pd.DataFrame(), execution_logs
+    def tile_worker(worker_driver):
+        own_driver = worker_driver is None
+        if own_driver:
+            worker_driver = pool.lease()
+        try:
+            while True:
+                tile = tile_queue.get()
+                if tile is None:
+                    return
+                try:
+                    count, stopped = discover_tile(worker_driver, target_object, tile,
+                                                   accept, wait_mode, feed_cap)
+                except Exception as e:
+                    log(f"Область {tile.lat:.4f},{tile.lng:.4f}: помилка пошуку: {e}")
+                    if is_crash_error(e):
+                        worker_driver = pool.restart(worker_driver, delay=2)
+                        own_driver = True
+                    tile_queue.retry(tile)
+                    continue
 
-    if not links_to_visit:
-        log("Немає посилань для обробки")
-        driver.quit()
-        return pd.DataFrame(), execution_logs
+                with lock:
+                    tile_counts["done"] += 1
+                if not stopped and count >= feed_cap and tile.depth < max_depth:
+                    log(f"Область {tile.lat:.4f},{tile.lng:.4f} (z{tile.zoom}): "
+                        f"{count} записів, ділю на 4")
+                    with lock:
+                        tile_counts["split"] += 1
+                    tile_queue.put_many(subdivide(tile))
+                tile_queue.done(tile)
+        finally:
+            if own_driver:
+                pool.release(worker_driver)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [submit(executor, tile_worker, driver if i == 0 else None)
+                   for i in range(workers)]
+        for future in futures:
+            future.result()
+
+    log(f"Областей оброблено: {tile_counts['done']}, поділено: {tile_counts['split']}")
+    log(f"Зібрано посилань: {len(links)}")
+    return links
+
+# запуск потоків обробки над спільною чергою
+# engine="http": сторінки завантажуються без браузера, а браузерні потоки
+# отримують тільки ті, які не вдалося розібрати
+# engine="cdp": num_threads браузерів по tabs_per_browser вкладок, керованих
+# через DevTools з одного циклу подій (див. cdp_engine.py)
+# controller: якщо передано, запускається controller.max_workers потоків,
+# а активними з них є лише controller.limit
+def start_workers(executor, url_queue, num_threads, is_headless, engine="selenium", http_concurrency=20, on_record=None, pool=None, net_stats=None, controller=None, block_profile="light", tabs_per_browser=4):
+    futures = []
+    if engine == "cdp":
+        from cdp_engine import cdp_worker
+        pool = pool or get_driver_pool(is_headless, block_profile)
+        futures.append(submit(executor, cdp_worker, url_queue, pool, num_threads,
+                              tabs_per_browser, block_profile, log, on_record))
+        return futures
+
+    if engine == "http":
+        from http_engine import http_worker
+        fallback_queue = UrlQueue(max_retries=2)
+        futures.append(submit(
+            executor, http_worker, url_queue, fallback_queue, http_concurrency, log, on_record))
+        url_queue = fallback_queue
+
+    if controller:
+        num_threads = controller.max_workers
+    futures.extend(submit(executor, scrape_worker, url_queue, is_headless, i + 1,
+                          None, on_record, pool, net_stats, controller)
+                   for i in range(num_threads))
+    return futures
+
+# збір статистики завантаження потоків (записи вже передані через on_record)
+def collect_workers(futures):
+    all_stats = []
+    for future in futures:
+        _, stats = future.result()
+        all_stats.append(stats)
+
+    for stats in all_stats:
+        log(stats.summary())
+    return all_stats
+
+# основна функція для збору даних з Google Maps: віддає записи по одному,
+# щойно потік їх зібрав
+# pipeline=True: обробка сторінок починається, поки стрічка ще прокручується
+# engine: "selenium", "http" (без браузера, з переходом на selenium за потреби)
+#   або "cdp" (кілька вкладок у кожному браузері, tabs_per_browser)
+# use_cache: свіжі записи з кешу (не старші за cache_ttl_hours) не відкриваються повторно
+# block_profile / track_network: блокування зайвих ресурсів і облік трафіку сторінок
+# wait_mode: "adaptive" (очікування подій DOM) або "fixed" (фіксовані паузи)
+# discovery: "feed" (одна стрічка на місто) або "tiled" (паралельний пошук по
+#   областях карти масштабу tile_zoom, num_threads браузерів)
+# sink: шлях до .csv або .parquet, куди записи пишуться одразу під час роботи
+# max_rss_mb: браузер, який займає більше пам'яті, перезапускається між сторінками
+# watchdog: вже запущений MemoryWatchdog цього пулу (наприклад, бенчмарку) замість
+#   власного, щоб на одному пулі не працювали два; max_rss_mb тоді не використовується
+# net_stats: NetworkStats для обліку трафіку (наприклад, бенчмарку); вмикає track_network
+# concurrency: AimdController — кількість активних потоків змінюється під час роботи
+#   в межах його min_workers..max_workers (num_threads тоді лише початкове значення)
+# run_log: журнал запуску (RunLogger); якщо не передано, створюється власний
+def iter_google_maps_data(target_object, target_city, max_results=10, num_threads=1, is_headless=False, show_console=False, run_log=None, **kwargs):
+    owns_log = run_log is None
+    if owns_log:
+        run_log = RunLogger()
+    token = current_run.set(run_log)
 
-    final_results = []
+    # якщо потрібен живий перегляд логів у PowerShell
+    if show_console:
+        try:
+            cmd = f'start powershell -NoExit -Command "Get-Content -Path \'{run_log.path}\' -Wait -Encoding UTF8"'
+            subprocess.Popen(cmd, shell=True)
+        except Exception as e:
+            log(f"Не вдалося відкрити PowerShell: {e}")
 
-    if num_threads == 1:
-        log("Режим одного потоку")
-        final_results = scrape_batch(
-            links_to_visit, is_headless, 1, external_driver=driver)
-        driver.quit()
-    else:
-        log("Режим багатьох потоків")
-        driver.quit()
+    try:
+        yield from _iter_records(target_object, target_city, max_results,
+                                 num_threads, is_headless, **kwargs)
+    finally:
+        summary = run_log.span_summary()
+        if summary:
+            log("Час фаз обробки сторінок:\n" + "\n".join(summary))
+        try:
+            current_run.reset(token)
+        except ValueError:
+            # генератор закрито з іншого контексту
+            pass
+        if owns_log:
+            run_log.close()
+
+def _iter_records(target_object, target_city, max_results=10, num_threads=1, is_headless=False, pipeline=False, engine="selenium", http_concurrency=20, use_cache=True, cache_ttl_hours=24, block_profile="light", track_network=False, wait_mode="adaptive", sink=None, concurrency=None, max_rss_mb=None, tabs_per_browser=4, discovery="feed", tile_zoom=14, watchdog=None, net_stats=None):
+    start_time = time.time()
+    log(f"Параметри пошуку: '{target_object}' у '{target_city}'")
 
-        chunk_size = (len(links_to_visit) + num_threads - 1) // num_threads
-        chunks = [links_to_visit[i:i + chunk_size]
-                  for i in range(0, len(links_to_visit), chunk_size)]
+    if net_stats is not None:
+        track_network = True
+    # вкладки CDP-рушія працюють поза scrape_worker: без контролера потоків,
+    # обліку трафіку і перезапуску браузерів між сторінками
+    if engine == "cdp":
+        ignored = [name for name, value in (("адаптивна кількість потоків", concurrency),
+                                            ("облік трафіку", track_network),
+                                            ("ліміт пам'яті браузера", max_rss_mb)) if value]
+        if ignored:
+            log(f"Рушій cdp не підтримує: {', '.join(ignored)} — вимкнено")
+        concurrency, track_network, max_rss_mb, watchdog = None, False, None, None
+        net_stats = None
+
+    pool = get_driver_pool(is_headless, block_profile, track_network)
+    if track_network and net_stats is None:
+        net_stats = NetworkStats(block_profile)
+    driver = pool.lease()
+    log(f"Браузер готовий: {time.time() - start_time:.2f} сек")
+    # поки йде пошук посилань, готуємо браузери для інших потоків
+    if concurrency:
+        num_threads = concurrency.limit
+    if engine in ("selenium", "cdp"):
+        pool.warm_async(num_threads if pipeline else num_threads - 1)
+    # ця ж сторінка міста далі використовується для пошуку (city_loaded=True)
+    city_found = check_city_exists(driver, target_city)
+    log(f"Час до першої навігації: {time.time() - start_time:.2f} сек")
+    if not city_found:
+        pool.release(driver)
+        return
+
+    url_queue = UrlQueue(max_retries=2)
+    results = queue.Queue()
+
+    cache = PlaceCache(ttl_hours=cache_ttl_hours) if use_cache else None
+    cache_stats = CacheStats()
+
+    # свіжі місця беремо з кешу, решту відправляємо в чергу на обробку
+    def enqueue(url):
+        if url_queue.cancelled:
+            return False
+        if cache:
+            cached = cache.get_fresh(place_id_from_url(url))
+            if cached:
+                record, seconds = cached
+                results.put(record)
+                cache_stats.hits += 1
+                cache_stats.saved += seconds
+                return True
+            cache_stats.misses += 1
+        url_queue.put(url)
+        return True
 
-        with ThreadPoolExecutor(max_workers=num_threads) as executor:
-            futures = []
-            for i, chunk in enumerate(chunks):
-                futures.append(executor.submit(scrape_batch, chunk, is_headless, i + 1))
-            for future in futures:
-                final_results.extend(future.result())
+    def save_record(url, record, seconds):
+        if cache:
+            cache.put(place_id_from_url(url), url, record, seconds)
+        results.put(record)
 
-    duration = time.time() - start_time
-    log(f"Загальний час виконання: {duration:.2f} сек")
+    def discover(on_link=None):
+        try:
+            if discovery == "tiled":
+                # після check_city_exists адреса містить видиму область міста
+                viewport = viewport_from_url(driver.current_url)
+                if viewport:
+                    return discover_tiled(pool, target_object, viewport, max_results,
+                                          on_link, max(1, num_threads), tile_zoom,
+                                          wait_mode, driver=driver)
+                log("Не вдалося визначити область міста, шукаю однією стрічкою")
+            return discover_links(driver, target_object, target_city, max_results,
+                                  on_link=on_link, wait_mode=wait_mode, city_loaded=True)
+        except Exception as e:
+            log(f"Критична помилка: {e}")
+            return []
+
+    if not pipeline:
+        links_to_visit = discover()
+
+        # драйвер пошуку не закриваємо, а повертаємо в пул для одного з потоків
+        pool.release(driver)
+        if not links_to_visit:
+            log("Немає посилань для обробки")
+            if cache:
+                cache.close()
+            return
+
+        # спільна черга: кожен потік бере наступне посилання, щойно звільнився
+        for url in links_to_visit:
+            enqueue(url)
+        url_queue.close()
+
+    def discover_and_close():
+        try:
+            discover(on_link=enqueue)
+        finally:
+            # без close() потоки чекали б нових посилань вічно
+            url_queue.close()
+            pool.release(driver)
+
+    log(f"Рушій: {engine}, потоків: {num_threads}")
+    if concurrency:
+        log(f"Адаптивна кількість потоків: {concurrency.min_workers}..{concurrency.max_workers}")
+    record_sink = open_sink(sink) if sink else None
+    owns_watchdog = watchdog is None and bool(max_rss_mb)
+    if owns_watchdog:
+        watchdog = MemoryWatchdog(pool, max_rss_mb, log=log).start()
+    executor = ThreadPoolExecutor(max_workers=(concurrency.max_workers if concurrency else num_threads) + 2)
+    discovery_future = None
+    try:
+        futures = start_workers(executor, url_queue, num_threads, is_headless,
+                                engine, http_concurrency, on_record=save_record,
+                                pool=pool, net_stats=net_stats, controller=concurrency,
+                                block_profile=block_profile, tabs_per_browser=tabs_per_browser)
+        if pipeline:
+            log("Конвеєрний режим: обробка починається під час прокрутки")
+            discovery_future = submit(executor, discover_and_close)
+
+        first_record = None
+        while True:
+            try:
+                record = results.get(timeout=0.2)
+            except queue.Empty:
+                # потік кладе записи в чергу до свого завершення, тому після
+                # завершення всіх потоків порожня черга означає кінець роботи
+                finished = all(f.done() for f in futures) and (discovery_future is None or discovery_future.done())
+                if finished and results.empty():
+                    break
+                continue
 
-    return pd.DataFrame(final_results), execution_logs
+            if first_record is None:
+                first_record = time.time()
+                log(f"Час до першого запису: {first_record - start_time:.2f} сек")
+            if record_sink:
+                record_sink.write(record)
+            yield record
+
+        collect_workers(futures)
+        if concurrency:
+            log(concurrency.summary())
+        if watchdog:
+            log(watchdog.summary())
+        if cache:
+            log(cache_stats.summary())
+        if net_stats:
+            log(net_stats.summary())
+
+        duration = time.time() - start_time
+        log(f"Загальний час виконання: {duration:.2f} сек")
+    finally:
+        # якщо споживач зупинився раніше, потоки доробляють поточну сторінку і виходять
+        url_queue.cancel()
+        executor.shutdown(wait=True)
+        if owns_watchdog:
+            watchdog.stop()
+        if record_sink:
+            record_sink.close()
+        if cache:
+            cache.close()
+
+# збір даних одним DataFrame (обгортка над iter_google_maps_data)
+def get_google_maps_data(target_object, target_city, max_results=10, num_threads=1, is_headless=False, show_console=False, **kwargs):
+    run_log = RunLogger()
+    try:
+        records = list(iter_google_maps_data(target_object, target_city, max_results,
+                                             num_threads, is_headless, show_console,
+                                             run_log=run_log, **kwargs))
+    finally:
+        run_log.close()
+    # pandas потрібен лише тут, тому не завантажується разом з модулем
+    from schema import to_frame
+    return to_frame(records, target_city), list(run_log.entries)
@@ -0,0 +1,59 @@
+import csv
+import os
+
+from extract import RECORD_COLUMNS
+
+
+# запис результатів у CSV по одному рядку, одразу на диск
+class CsvSink:
+    def __init__(self, path, columns=RECORD_COLUMNS):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=columns, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def write(self, record):
+        self._writer.writerow(record)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+# запис результатів у Parquet групами рядків, щоб не тримати все в пам'яті
+class ParquetSink:
+    def __init__(self, path, columns=RECORD_COLUMNS, batch_size=100):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._columns = columns
+        self._schema = pa.schema([(c, pa.string()) for c in columns])
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._batch = []
+        self._batch_size = batch_size
+
+    def write(self, record):
+        self._batch.append(record)
+        if len(self._batch) >= self._batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._batch:
+            return
+        data = {c: [str(r.get(c, "")) for r in self._batch] for c in self._columns}
+        self._writer.write_table(self._pa.Table.from_pydict(data, schema=self._schema))
+        self._batch = []
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+
+# вибір формату за розширенням файлу
+def open_sink(path, columns=RECORD_COLUMNS):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return CsvSink(path, columns)
+    if ext in (".parquet", ".pq"):
+        return ParquetSink(path, columns)
+    raise ValueError(f"Непідтримуваний формат файлу: {ext}")
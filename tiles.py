@@ -0,0 +1,59 @@
+import math
+import re
+from collections import namedtuple
+from urllib.parse import quote
+
+# видима область карти: @широта,довгота,масштабz в адресі Google Maps
+VIEWPORT_RE = re.compile(r"@(-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?),(\d+(?:\.\d+)?)z")
+# розмір вікна браузера з get_driver (ширина, висота в пікселях)
+WINDOW_SIZE = (1080, 1920)
+# стрічка Google Maps не віддає більше результатів для однієї області
+TILE_FEED_CAP = 120
+
+Tile = namedtuple("Tile", ["lat", "lng", "zoom", "depth"])
+
+
+def viewport_from_url(url):
+    match = VIEWPORT_RE.search(url or "")
+    if not match:
+        return None
+    lat, lng, zoom = match.groups()
+    return Tile(float(lat), float(lng), int(float(zoom)), 0)
+
+
+# розмір області в градусах (проєкція Меркатора, 256 пікселів на тайл)
+def tile_span(tile):
+    degrees_per_px = 360 / 256 / 2 ** tile.zoom
+    width, height = WINDOW_SIZE
+    return (height * degrees_per_px * math.cos(math.radians(tile.lat)),
+            width * degrees_per_px)
+
+
+# межі області: (південь, захід, північ, схід)
+def tile_bounds(tile):
+    lat_span, lng_span = tile_span(tile)
+    return (tile.lat - lat_span / 2, tile.lng - lng_span / 2,
+            tile.lat + lat_span / 2, tile.lng + lng_span / 2)
+
+
+# сітка областей масштабу tile_zoom, яка покриває видиму область міста
+def city_tiles(viewport, tile_zoom=14):
+    tile_zoom = max(tile_zoom, viewport.zoom)
+    side = 2 ** (tile_zoom - viewport.zoom)
+    south, west, north, east = tile_bounds(viewport)
+    lat_step = (north - south) / side
+    lng_step = (east - west) / side
+    return [Tile(south + lat_step * (row + 0.5), west + lng_step * (col + 0.5), tile_zoom, 0)
+            for row in range(side) for col in range(side)]
+
+
+# чотири області наступного масштабу на місці однієї
+def subdivide(tile):
+    lat_span, lng_span = tile_span(tile)
+    return [Tile(tile.lat + dlat * lat_span / 4, tile.lng + dlng * lng_span / 4,
+                 tile.zoom + 1, tile.depth + 1)
+            for dlat in (-1, 1) for dlng in (-1, 1)]
+
+
+def tile_url(maps_url, query, tile):
+    return f"{maps_url}/search/{quote(query)}/@{tile.lat:.6f},{tile.lng:.6f},{tile.zoom}z"
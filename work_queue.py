@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import deque
+
+
+# спільна черга посилань, з якої потоки беруть роботу по одному URL
+class UrlQueue:
+    def __init__(self, max_retries=2):
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._closed = False
+        self.cancelled = False
+        self._attempts = {}
+        self._max_retries = max_retries
+
+    def put(self, url):
+        with self._cond:
+            if self.cancelled:
+                return
+            self._items.append(url)
+            self._cond.notify()
+
+    def put_many(self, urls):
+        with self._cond:
+            if self.cancelled:
+                return
+            self._items.extend(urls)
+            self._cond.notify_all()
+
+    # більше нових посилань не буде (повтори ще можливі)
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    # зупинка роботи: нові посилання і повтори більше не приймаються
+    def cancel(self):
+        with self._cond:
+            self.cancelled = True
+            self._closed = True
+            self._items.clear()
+            self._cond.notify_all()
+
+    # повертає наступний URL або None, коли роботи більше немає
+    def get(self):
+        with self._cond:
+            while True:
+                if self._items:
+                    self._in_flight += 1
+                    return self._items.popleft()
+                if self._closed and self._in_flight == 0:
+                    return None
+                self._cond.wait()
+
+    def done(self, url):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    # повертаємо URL у кінець черги, якщо ще не вичерпано спроби
+    def retry(self, url):
+        with self._cond:
+            self._in_flight -= 1
+            attempts = self._attempts.get(url, 0) + 1
+            self._attempts[url] = attempts
+            if attempts <= self._max_retries and not self.cancelled:
+                self._items.append(url)
+                self._cond.notify()
+                return True
+            self._cond.notify_all()
+            return False
+
+    def pending(self):
+        with self._cond:
+            return len(self._items) + self._in_flight
+
+    # роботи більше не буде: get() поверне None
+    def finished(self):
+        with self._cond:
+            return self._closed and not self._items and self._in_flight == 0
+
+
+# статистика завантаження одного потоку
+class WorkerStats:
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.started = time.time()
+        self.finished = None
+        self.first_record = None
+        self.busy = 0.0
+        self.idle = 0.0
+        self.pages = 0
+        self.retries = 0
+        self.failures = 0
+
+    def finish(self):
+        self.finished = time.time()
+
+    def utilization(self):
+        total = self.busy + self.idle
+        return self.busy / total if total else 0.0
+
+    def summary(self):
+        return (f"Thread-{self.worker_id}: сторінок {self.pages}, "
+                f"робота {self.busy:.1f} с, очікування {self.idle:.1f} с, "
+                f"завантаження {self.utilization() * 100:.0f}%, "
+                f"повторів {self.retries}, помилок {self.failures}")